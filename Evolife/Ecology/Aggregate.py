@@ -0,0 +1,505 @@
+#!/usr/bin/env python3
+##############################################################################
+# EVOLIFE  http://evolife.telecom-paris.fr             Jean-Louis Dessalles  #
+# Telecom Paris  2021                                      www.dessalles.fr  #
+# -------------------------------------------------------------------------- #
+# License:  Creative Commons BY-NC-SA                                        #
+##############################################################################
+
+
+##############################################################################
+#  Aggregate                                                                 #
+##############################################################################
+
+
+""" EVOLIFE: Module Aggregate:
+		Populations represented by genotype counts.
+		When genomes are short and interactions are defined by payoffs
+		(see PayoffGame in Default_Scenario), individuals that share
+		DNA, age, score and life points need not be simulated separately.
+		Each group is a count of such classes, and the life cycle
+		(interactions, selection, reproduction, mutation, deaths, migration)
+		is performed by binomial, multinomial and hypergeometric draws on counts.
+		A year then costs time in proportion to the number of classes,
+		not to the number of individuals.
+
+		Approximations:
+		- an individual receives, each time it is chosen as partner,
+		  the average gift of those who chose individuals of its genotype
+		- parents are drawn in proportion to their remaining number of children
+		- scenario functions that require actual members (season, end_game,
+		  new_agent, remove_agent, update_positions) are not called
+"""
+
+
+import sys
+if __name__ == '__main__':  # for tests
+	sys.path.append('../..')
+	from Evolife.Scenarii.MyScenario import InstantiateScenario
+	InstantiateScenario('GreenBeard','../Evolife')
+
+from collections import Counter
+from itertools import combinations
+from functools import reduce
+from operator import xor
+
+from Evolife.Tools.Tools import error, chances, decrease_sum, binomial, multinomial, sample_counts
+from Evolife.Ecology.Individual import EvolifeIndividual
+from Evolife.Ecology.Observer import WeightedExaminer
+from Evolife.Ecology.Population import EvolifePopulation
+from Evolife.Genetics.Genome import Genome
+from Evolife.Genetics.DNA import DNA_matrix, _tail_masks
+from Evolife.Genetics.Diversity import Diversity
+
+MaxNucleotides = 10	# longer genomes have too many genotypes to be counted
+
+# classes of individuals are (Row, Age, Score, LifePoints) tuples, where Row is packed DNA (see DNA_matrix)
+
+class Genotypes:
+	""" Knowledge about all genotypes of a short genome, shared by groups:
+		representative individuals, game classes, payoffs,
+		compatibility of mates, distribution of offspring
+	"""
+
+	def __init__(self, Scenario):
+		self.Scenario = Scenario
+		self.nb_nucleotides = Scenario.geneMap_length()
+		if self.nb_nucleotides > MaxNucleotides:
+			error('Aggregate', 'genotype counts are limited to genomes of %d nucleotides' % MaxNucleotides)
+		if not Scenario.PayoffGame:
+			error('Aggregate', 'genotype counts require interactions defined by payoffs (see PayoffGame)')
+		self.representatives = dict()	# one individual per genotype, used to query the scenario
+		self.classes = dict()	# game class of each genotype
+		self.payoffs = dict()	# gains for each pair of genotypes
+		self.compatibility = dict()	# whether two genotypes may mate
+		self.offspring = dict()	# distribution of children's DNA for each pair of parents
+		self.mutations = self.mutation_masks()
+
+	def representative(self, Row):
+		" returns an individual holding DNA Row "
+		try:	return self.representatives[Row]
+		except KeyError:
+			Indiv = EvolifeIndividual(self.Scenario, ID='G%d' % Row, Newborn=True)
+			Indiv.set_row(Row)
+			Indiv.update()	# gene values are read from DNA
+			self.representatives[Row] = Indiv
+			return Indiv
+
+	def payoff(self, Row1, Row2):
+		" gains of an individual with DNA Row1 and of its partner with DNA Row2 "
+		try:	return self.payoffs[(Row1, Row2)]
+		except KeyError:
+			for Row in (Row1, Row2):
+				if Row not in self.classes:	self.classes[Row] = self.Scenario.game_class(self.representative(Row))
+			Gains = self.payoffs[(Row1, Row2)] = self.Scenario.payoff(self.classes[Row1], self.classes[Row2])
+			return Gains
+
+	def compatible(self, Row1, Row2):
+		" whether individuals with DNA Row1 and Row2 may mate "
+		try:	return self.compatibility[(Row1, Row2)]
+		except KeyError:
+			C = self.compatibility[(Row1, Row2)] = self.Scenario.compatible(self.representative(Row1),
+																			self.representative(Row2))
+			return C
+
+	def mutation_masks(self):
+		""" probabilities of the bits flipped in a newborn's DNA.
+			As in DNA.mutate, the number of mutations is drawn by 'chances'
+			and each mutation flips a random nucleotide
+		"""
+		Nb = self.nb_nucleotides
+		if Nb == 0:	return {0: 1.0}
+		Expected = self.Scenario.Parameter('MutationRate') / 1000.0 * Nb
+		Masks = {0: 1.0}
+		Result = Counter()
+		for Flips in range(int(Expected) + 2):
+			Proba = {int(Expected): 1 - Expected % 1, int(Expected) + 1: Expected % 1}.get(Flips, 0)
+			for (Mask, P) in Masks.items():	Result[Mask] += Proba * P
+			# one more mutation at a random locus
+			Next = Counter()
+			for (Mask, P) in Masks.items():
+				for locus in range(Nb):	Next[Mask ^ (1 << locus)] += P / Nb
+			Masks = Next
+		return {Mask: P for (Mask, P) in Result.items() if P > 0}
+
+	def children_distribution(self, Row1, Row2):
+		" probabilities of children's DNA for parents with DNA Row1 and Row2 (crossover + mutation) "
+		try:	return self.offspring[(Row1, Row2)]
+		except KeyError:	pass
+		Nb = self.nb_nucleotides
+		# crossovers are drawn as in DNA.hybrid: all sets of crossover points are equiprobable
+		if Nb > 1:
+			Tails = _tail_masks(Nb)
+			Cuts = list(combinations(range(1, Nb), min(self.Scenario.Parameter('NbCrossover'), Nb - 1)))
+			CrossMasks = [reduce(xor, [Tails[c] for c in Cut], 0) for Cut in Cuts]
+		else:	CrossMasks = [0]
+		Hybrids = Counter()
+		for Mask in CrossMasks:
+			# starting from one parent or the other
+			for (parent1, parent2) in ((Row1, Row2), (Row2, Row1)):
+				Hybrids[parent1 ^ ((parent1 ^ parent2) & Mask)] += 0.5 / len(CrossMasks)
+		Children = Counter()
+		for (Row, P) in Hybrids.items():
+			for (Mask, Q) in self.mutations.items():	Children[Row ^ Mask] += P * Q
+		Distribution = self.offspring[(Row1, Row2)] = (list(Children.keys()), list(Children.values()))
+		return Distribution
+
+	def children(self, Row1, Row2, Nb):
+		" returns the DNA of Nb children of parents with DNA Row1 and Row2, as a list of (Row, count) "
+		(Rows, Probas) = self.children_distribution(Row1, Row2)
+		return [(Row, N) for (Row, N) in zip(Rows, multinomial(Nb, Probas)) if N]
+
+
+class GenotypeGroup:
+	"   group represented by counts of classes of individuals "
+
+	def __init__(self, Scenario, Genotypes, ID=1, Size=100):
+		self.Scenario = Scenario
+		self.genotypes = Genotypes
+		self.counts = Counter()	# number of individuals in each (Row, Age, Score, LifePoints) class
+		self.size = 0
+		self.best_score = 0
+		self.ID = ID
+		self.location = 0
+		self.Examiner = WeightedExaminer('GroupObs'+str(self.ID))
+		# initial individuals get random ages, as in Individual
+		AgeMax = self.Scenario.Parameter('AgeMax', Default=100)
+		Ages = multinomial(Size, [1.0/AgeMax] * AgeMax)
+		for (Age, Nb) in enumerate(Ages, 1):
+			if Nb:	self.initial_rows(Age, Nb)
+		self.update_(flagRanking=True)
+		self.statistics()
+
+	def initial_rows(self, Age, Nb):
+		" creates Nb individuals of age Age with initial DNA (see DNAFill) "
+		Fill = self.Scenario.Parameter('DNAFill', Default=-1)
+		Nucleotides = self.genotypes.nb_nucleotides
+		if Fill == 1:	self.add((((1 << Nucleotides) - 1), Age, 0, 0), Nb)
+		elif Fill == 0 or Nucleotides == 0:	self.add((0, Age, 0, 0), Nb)
+		else:
+			# DNA is random: all genotypes are equiprobable
+			Rows = 1 << Nucleotides
+			for (Row, N) in enumerate(multinomial(Nb, [1.0/Rows] * Rows)):
+				if N:	self.add((Row, Age, 0, 0), N)
+
+	def add(self, Class, Nb):
+		" adds Nb individuals of a given class "
+		self.counts[Class] += Nb
+		self.size += Nb
+
+	def remove(self, Class, Nb):
+		" removes Nb individuals of a given class "
+		self.counts[Class] -= Nb
+		if self.counts[Class] <= 0:	del self.counts[Class]
+		self.size -= Nb
+
+	def classes(self):
+		" list of (class, number of individuals) "
+		return list(self.counts.items())
+
+	def accidents(self, Class, Nb):
+		" Nb individuals of a given class lose one life point - returns the number of dead "
+		self.remove(Class, Nb)
+		(Row, Age, Score, LifePoints) = Class
+		if LifePoints - 1 < 0:	return Nb	# see Individual.dead
+		self.add((Row, Age, Score, LifePoints - 1), Nb)
+		return 0
+
+	def genome_totals(self):
+		" number of individuals with each DNA "
+		Totals = Counter()
+		for ((Row, Age, Score, LifePoints), Nb) in self.counts.items():	Totals[Row] += Nb
+		return Totals
+
+	def bury(self):
+		" removes individuals that exceed maximal age "
+		AgeMax = self.Scenario.Parameter('AgeMax', Default=0)
+		if AgeMax:
+			for (Class, Nb) in self.classes():
+				if Class[1] > AgeMax:	self.remove(Class, Nb)
+
+	def update_(self, flagRanking = False, display=False):
+		" removes old individuals and updates best score "
+		self.bury()
+		if self.size:	self.best_score = max([Class[2] for Class in self.counts])
+		return self.size
+
+	def statistics(self):
+		" stores statistics about the group, one vector per class "
+		self.Examiner.reset()
+		self.Examiner.open_()
+		for ((Row, Age, Score, LifePoints), Nb) in self.counts.items():
+			Indiv = self.genotypes.representative(Row)
+			self.Examiner.store('Properties', [Age, Score], Weight=Nb)
+			self.Examiner.store('Genomes', Genome.signature(Indiv), Weight=Nb)
+			self.Examiner.store('DNA', list(Indiv.get_DNA()), Weight=Nb)
+		self.Examiner.close_()
+
+	def season(self, year):
+		" individuals get older each year "
+		Counts = Counter()
+		for ((Row, Age, Score, LifePoints), Nb) in self.counts.items():
+			Counts[(Row, Age + 1, Score, LifePoints)] += Nb
+		self.counts = Counts
+
+	def life_game(self):
+		""" scores are initialized by start_game, then modified by interactions
+			and evaluation, and finally converted into life points (see Default_Scenario)
+		"""
+		Scenario = self.Scenario
+		Scores = dict()	# score of representatives of each (Row, Score) after start_game and evaluation
+		def prepared(Row, Score):
+			if (Row, Score) not in Scores:
+				Indiv = self.genotypes.representative(Row)
+				Indiv.score(Score, FlagSet=True)
+				Scenario.start_game([Indiv])
+				Scores[(Row, Score)] = Indiv.score()
+			return Scores[(Row, Score)]
+		self.counts = self.reclassify(lambda Row, Score: prepared(Row, Score))
+		for play in range(Scenario.Parameter('Rounds', Default=1)):
+			self.encounters()
+		Scores = dict()
+		def evaluated(Row, Score):
+			if (Row, Score) not in Scores:
+				Indiv = self.genotypes.representative(Row)
+				Indiv.score(Score, FlagSet=True)
+				Scenario.evaluate(Indiv)
+				Scores[(Row, Score)] = Indiv.score()
+			return Scores[(Row, Score)]
+		self.counts = self.reclassify(evaluated)
+		self.lives()
+
+	def reclassify(self, NewScore):
+		" changes scores of all classes according to NewScore(Row, Score) "
+		Counts = Counter()
+		for ((Row, Age, Score, LifePoints), Nb) in self.counts.items():
+			Counts[(Row, Age, NewScore(Row, Score), LifePoints)] += Nb
+		return Counts
+
+	def encounters(self):
+		""" each individual interacts with a randomly chosen partner (see 'life_game' in Default_Scenario).
+			Partners' genotypes are drawn for all individuals of a class at once.
+			Then individuals are split according to the number of times they have been chosen
+		"""
+		if self.size < 2:	return
+		Totals = self.genome_totals()
+		Rows = list(Totals)
+		Choices = Counter()	# number of individuals with DNA Row1 that chose partners with DNA Row2
+		Counts = Counter()
+		for ((Row, Age, Score, LifePoints), Nb) in self.counts.items():
+			# the partner is anyone else
+			Probas = [(Totals[Partner] - (Partner == Row)) / (self.size - 1.0) for Partner in Rows]
+			for (Partner, N) in zip(Rows, multinomial(Nb, Probas)):
+				if N:
+					Counts[(Row, Age, Score + self.genotypes.payoff(Row, Partner)[0], LifePoints)] += N
+					Choices[(Row, Partner)] += N
+		Received = dict()	# gains received by individuals of each genotype depending on the number of times they were chosen
+		for Row in Rows:
+			Chosen = sum([Choices[(Chooser, Row)] for Chooser in Rows])
+			Gift = sum([Choices[(Chooser, Row)] * self.genotypes.payoff(Chooser, Row)[1] for Chooser in Rows])
+			if Gift:	Received[Row] = self.chosen_times(Chosen, Totals[Row], Gift / float(Chosen))
+		self.counts = Counter()
+		for ((Row, Age, Score, LifePoints), Nb) in Counts.items():
+			if Row in Received:
+				(Gains, Probas) = Received[Row]
+				for (Gain, N) in zip(Gains, multinomial(Nb, Probas)):
+					if N:	self.counts[(Row, Age, Score + Gain, LifePoints)] += N
+			else:	self.counts[(Row, Age, Score, LifePoints)] += Nb
+
+	def chosen_times(self, Chosen, Nb, Gift):
+		""" Chosen choices fall at random on Nb individuals: returns the possible gains
+			(multiples of Gift) and the probability for an individual to get each of them
+		"""
+		if Nb == 1:	return ([Chosen * Gift], [1.0])
+		p = 1.0 / Nb
+		Proba = (1 - p) ** Chosen	# not chosen at all
+		(Gains, Probas) = ([0], [Proba])
+		Cumulative = Proba
+		for Times in range(1, Chosen + 1):
+			if Cumulative > 1 - 1e-9:	break	# remaining cases are negligible
+			Proba *= (Chosen - Times + 1) / float(Times) * p / (1 - p)	# binomial law
+			Gains.append(Times * Gift)
+			Probas.append(Proba)
+			Cumulative += Proba
+		return (Gains, Probas)
+
+	def lives(self):
+		" converts scores into life points (see Default_Scenario.lives) "
+		Pressure = self.Scenario.Parameter('SelectionPressure')
+		if Pressure == 0 or self.size == 0:	return
+		Scores = [Class[2] for Class in self.counts]
+		(BestScore, MinScore) = (max(Scores), min(Scores))
+		if BestScore == MinScore:	return
+		Range = float(BestScore - MinScore)
+		Counts = Counter()
+		for ((Row, Age, Score, LifePoints), Nb) in self.counts.items():
+			Counts[(Row, Age, Score, (Pressure * (Score - MinScore)) / Range)] += Nb
+		self.counts = Counts
+
+	def parenthood(self, nb_children):
+		""" number of children that individuals of each genotype may have.
+			Individuals are ranked by score (see Default_Scenario.parenthood):
+			individuals with same score share the corresponding ranks
+		"""
+		Slots = Counter()
+		ByScore = dict()
+		for ((Row, Age, Score, LifePoints), Nb) in self.counts.items():
+			ByScore.setdefault(Score, Counter())[Row] += Nb
+		Rank = 0
+		for Score in sorted(ByScore, reverse=True):
+			Block = ByScore[Score]
+			BlockSize = sum(Block.values())
+			Expected = 2 * nb_children * decrease_sum(Rank, Rank + BlockSize, self.size, self.Scenario.Parameter('Selectivity'))
+			for (Row, Nb) in Block.items():
+				# each individual gets the integer part of its expected number of children, plus one with some probability
+				Mean = Expected / BlockSize
+				Slots[Row] += Nb * int(Mean) + binomial(Nb, Mean % 1)
+			Rank += BlockSize
+		return Slots
+
+	def couples(self, nb_children):
+		""" returns the number of couples for each pair of parents' DNA.
+			Parents are drawn according to their number of children (see Default_Scenario.couples).
+			Pairs that are not compatible are drawn again (at most 10 times, as in S_GreenBeard)
+		"""
+		Slots = self.parenthood(nb_children)
+		Rows = list(Slots)
+		Couples = Counter()
+		Needed = nb_children
+		for Trial in range(10):
+			Available = [Slots[Row] for Row in Rows]
+			Pairs = min(Needed, sum(Available) // 2)
+			if Pairs == 0:	break
+			Parents = sample_counts(Available, 2 * Pairs)
+			Mothers = sample_counts(Parents, Pairs)
+			Fathers = [P - M for (P, M) in zip(Parents, Mothers)]
+			for (Row1, NbMothers) in zip(Rows, Mothers):
+				if NbMothers == 0:	continue
+				# mothers are matched with fathers at random
+				Matched = sample_counts(Fathers, NbMothers)
+				Fathers = [F - M for (F, M) in zip(Fathers, Matched)]
+				for (Row2, Nb) in zip(Rows, Matched):
+					if Nb and self.genotypes.compatible(Row1, Row2):
+						Couples[(Row1, Row2)] += Nb
+						Slots[Row1] -= Nb
+						Slots[Row2] -= Nb
+						Needed -= Nb
+			if Needed == 0:	break
+		return Couples
+
+	def reproduction(self):
+		" reproduction within the group - newborns have age, score and life points 0 "
+		self.update_()
+		nb_children = chances(self.Scenario.Parameter('ReproductionRate') / 100.0, self.size)
+		for ((Row1, Row2), Nb) in self.couples(nb_children).items():
+			for (Row, N) in self.genotypes.children(Row1, Row2, Nb):
+				self.add((Row, 0, 0, 0), N)
+
+	def genome_matrix(self, SampleSize=300):
+		" returns the DNA of a sample of members as a DNA_matrix "
+		Totals = self.genome_totals()
+		Matrix = DNA_matrix(self.Scenario, self.genotypes.nb_nucleotides)
+		for (Row, Nb) in zip(Totals, sample_counts(list(Totals.values()), SampleSize)):
+			Matrix.rows += [Row] * Nb
+		return Matrix
+
+	def diversity(self):
+		" returns measures of genetic diversity within the group (see Diversity) "
+		return Diversity(self.genome_matrix()).summary()
+
+	def __len__(self):	return self.size
+
+	def __str__(self):
+		return '\n'.join(['DNA %d\tage: %d\tscore: %.02f\t%d individuals' % (Row, Age, Score, Nb)
+							for ((Row, Age, Score, LifePoints), Nb) in sorted(self.counts.items())]) + '\n'
+
+
+class GenotypePopulation(EvolifePopulation):
+	""" EvolifePopulation in which groups are counts of genotypes (see GenotypeGroup).
+		Deaths and migrations are drawn among all classes at once
+	"""
+
+	def __init__(self, Scenario, Evolife_Obs):
+		self.genotypes = Genotypes(Scenario)
+		EvolifePopulation.__init__(self, Scenario, Evolife_Obs)
+
+	def createGroup(self, ID=0, Size=0):
+		return GenotypeGroup(self.Scenario, self.genotypes, ID=ID, Size=Size)
+
+	def classes(self):
+		" list of (group, class, number of individuals) for all groups "
+		return [(gr, Class, Nb) for gr in self.groups for (Class, Nb) in gr.classes()]
+
+	def draw(self, Nb):
+		" draws Nb distinct individuals at random - returns a list of (group, class, number drawn) "
+		Classes = self.classes()
+		return [(gr, Class, N) for ((gr, Class, Size), N)
+					in zip(Classes, sample_counts([Size for (gr, Class, Size) in Classes], Nb)) if N]
+
+	def reproduction(self):
+		" launches reproduction in groups "
+		for gr in self.groups:
+			gr.reproduction()
+		self.update()
+
+	def limit(self):
+		" randomly kills individuals until size is reached "
+		self.update()
+		while self.popSize > self.Scenario.Parameter('PopulationSize'):
+			# as many distinct individuals as in excess suffer an accident
+			for (gr, Class, Nb) in self.draw(self.popSize - self.Scenario.Parameter('PopulationSize')):
+				self.popSize -= gr.accidents(Class, Nb)
+		self.update(display=True)
+
+	def migration(self):
+		" migration between groups of some percentage of individuals "
+		if len(self.groups) < 2 or self.Scenario.Parameter('MigrationRate', Default=0) == 0:
+			return	# no migration if only one group
+		migrants = int(self.Scenario.Parameter('MigrationRate') * self.popSize/100.0 + 0.5)
+		# destinations are chosen proportionally to group size
+		Weights = [float(gr.size) / self.popSize for gr in self.groups]
+		Groups = self.groups[:]
+		for (gr_out, Class, Nb) in self.draw(migrants):
+			gr_out.remove(Class, Nb)
+			for (gr_in, N) in zip(Groups, multinomial(Nb, Weights)):
+				if N:	gr_in.add(Class, N)
+
+	def group_splitting(self):
+		""" groups that are too big are split in two,
+			and too small groups are dispersed """
+		for gr in self.groups[:]:
+			if gr.size > self.groupMaxSize:
+				effectif = int(gr.size/2.0 + .5)
+				newgroup = self.createGroup(ID=len(self.groups)+1)
+				# half of the members leave
+				Classes = gr.classes()
+				for ((Class, Size), N) in zip(Classes, sample_counts([Size for (Class, Size) in Classes], effectif)):
+					if N:
+						gr.remove(Class, N)
+						newgroup.add(Class, N)
+				newgroup.update_()
+				self.groups.append(newgroup)
+		if self.Scenario.Parameter('GroupMinSize', Default=0) ==0: return	# No group minimum size
+		for gr in self.groups[:]:
+			if gr.size < self.Scenario.Parameter('GroupMinSize'):
+				self.groups.remove(gr)
+				if self.groups == []:
+					self.popSize -= gr.size
+					return  # dying population
+				# dispersed members join groups independently of their size
+				Weights = [1.0 / len(self.groups)] * len(self.groups)
+				for (Class, Nb) in gr.classes():
+					for (gr_in, N) in zip(self.groups, multinomial(Nb, Weights)):
+						if N:	gr_in.add(Class, N)
+
+
+###############################
+# Local Test                  #
+###############################
+
+if __name__ == "__main__":
+	print(__doc__)
+	print(GenotypeGroup.__doc__ + '\n')
+
+
+__author__ = 'Dessalles'
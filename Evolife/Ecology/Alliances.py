@@ -21,65 +21,91 @@ import sys
 if __name__ == '__main__':  sys.path.append('../..')  # for tests
 
 
+from bisect import bisect_left, bisect_right, insort
+from itertools import count
+
 from Evolife.Tools.Tools import error
 
+LinkChanges = 0	# counts entries and exits in all clubs (to know when network snapshots are outdated)
+
+def link_changes():	return LinkChanges
+
+Arrivals = count()	# arrival numbers, shared by all clubs (to break ties between equal performances)
+
 class club:
 	""" class club: list of individuals associated with their performance.
 		The performance is used to decide who gets acquainted with whom.
+		Members are stored in a dictionary (in order of arrival)
+		and in a list sorted by decreasing performance, kept up to date
+		at each entry and exit.
+		If the club has an owner, members know about it (see Friend.followedBy).
 	"""
 
-	def __init__(self, sizeMax = 0):
+	__slots__ = ('sizeMax', 'owner', '__members', '__ranking')
+
+	def __init__(self, sizeMax = 0, Owner=None):
 		self.sizeMax = sizeMax
 		if sizeMax == 0:
 			self.sizeMax = sys.maxsize
-		self.reset()
+		self.owner = Owner
+		self.__members = dict()   # performance of each individual, in order of arrival
+		self.__ranking = []	# (-performance, arrival number, individual), sorted
 
 	def reset(self):
-		self.__members = []   # list of couples (individual,performance)
+		for M in self.__members:	self.__backlink(M, False)
+		self.__members.clear()
+		del self.__ranking[:]
 		
 	# def members(self):	return self.__members
 	
-	def names(self):	return [T[0] for T in self]
+	def names(self):	return list(self.__members)
 
-	def performances(self):	return [T[1] for T in self]
+	def performances(self):	return list(self.__members.values())
 		
-	def present(self, MemberPerf):	return MemberPerf in self
+	def present(self, MemberPerf):
+		(Member, Perf) = MemberPerf
+		return Member in self.__members and self.__members[Member] == Perf
+
+	def isMember(self, Member):	return Member in self.__members
 			
 	def ordered(self, ordered=True):
 		if ordered:
-			return [T[0] for T in sorted(self.__members, key = lambda x: x[1], reverse=True)]
-		return [T[0] for T in self]
+			return [T[2] for T in self.__ranking]
+		return self.names()
 		
 	def rank(self, Member):
-		try:	return self.ordered().index(Member)
-		except ValueError:	return -1
+		if Member not in self.__members:	return -1
+		# Member is found among those with the same performance
+		Rank = bisect_left(self.__ranking, (-self.__members[Member],))
+		while self.__ranking[Rank][2] is not Member:	Rank += 1
+		return Rank
 
 	def performance(self, Member):
-		try:	return self.__members[self.names().index(Member)][1]
-		except ValueError:	error('Alliances', 'Searching for non-member')
+		try:	return self.__members[Member]
+		except KeyError:	error('Alliances', 'Searching for non-member')
 	
 	def size(self):	return len(self.__members)
 
 	def minimal(self):
 		" returns the minimal performance among members "
-		if self.size():	return min([T[1] for T in self])
+		if self.size():	return -self.__ranking[-1][0]
 		return -1
 
 	def maximal(self):
 		" returns the maximal performance among members "		
-		if self.size():	return max([T[1] for T in self])
+		if self.size():	return -self.__ranking[0][0]
 		return -1
 
 	def best(self):
 		" returns the member with the best performance "
-		# if self.size():	return self.ordered()[0]
-		# if self.size():	return max([T for T in self.__members], key=lambda x: x[1])[0]
-		if self.size():	return max(self, key=lambda x: x[1])[0]
+		# first arrived among best members
+		if self.size():	return self.__ranking[0][2]
 		return None
 
 	def worst(self):
 		" returns the member with the worst performance "
-		if self.size():	return self.ordered()[-1]
+		# last arrived among worst members
+		if self.size():	return self.__ranking[-1][2]
 		return None
 
 	def accepts(self, performance, conservative=True):
@@ -89,41 +115,59 @@ class club:
 				return -1   # equality: priority given to former members
 			elif performance < self.minimal():	return -1
 		# returning the rank that the candidate would be assigned
-		#  return sorted([performance] + self.performances(),reverse=True).index(performance)
-		rank = self.size() - sorted([performance] + self.performances()).index(performance)
+		# (i.e. the number of members whose performance is at least as good)
+		rank = bisect_right(self.__ranking, (-performance, sys.maxsize))
 		if rank <= self.sizeMax:	return rank
 		error('Alliances', 'accept')
 		
 	def enters(self, newMember, performance, conservative=True):
 		if self.accepts(performance, conservative=conservative) >= 0:
 			# First, check whether newMember is not already a member
-			if newMember in self.names():
+			if newMember in self.__members:
 				self.exits(newMember)   # to prepare the come-back
 			if self.size() >= self.sizeMax:
 				worst = self.worst() # the redundant individual will be ejected
 			else:	worst = None
-			self.__members.append((newMember, performance))
+			self.__members[newMember] = performance
+			insort(self.__ranking, (-performance, next(Arrivals), newMember))
+			self.__backlink(newMember, True)
 			return worst
 		error("Alliances: unchecked admittance")
 		return None
 
 	def exits(self, oldMember):
 		" a member goes out from the club "
-		for (M,Perf) in self.__members[:]:  # safe to copy the list as it is changed within the loop
-			if M == oldMember:
-				self.__members.remove((oldMember,Perf))
-				return True
+		if oldMember in self.__members:
+			del self.__ranking[self.rank(oldMember)]
+			del self.__members[oldMember]
+			self.__backlink(oldMember, False)
+			return True
 		print('exiled: %s' % str(oldMember))
 		error('Alliances: non-member attempting to quit a club')
 		return False
 
+	def __backlink(self, Member, Linked):
+		" keeps the reverse index of Member up to date (see Friend.followedBy) "
+		global LinkChanges
+		LinkChanges += 1
+		if self.owner is None:	return
+		try:	Owners = Member.followedBy
+		except AttributeError:	return	# member unaware of who follows it
+		if Linked:
+			if Owners:	Owners.add(self.owner)
+			else:	Member.followedBy = {self.owner}	# first admirer
+		elif Owners:	Owners.discard(self.owner)
+
 	def weakening(self, Factor = 0.9):  # temporary value
 		" all performances are reduced (represents temporal erosion)  "
-		for (M,Perf) in self.__members[:]:  # safe to copy the list as it is changed within the loop
-			self.__members.remove((M, Perf))
-			self.__members.append((M, Perf * Factor))
-
-	def __iter__(self):	return iter(self.__members)
+		for M in self.__members:	self.__members[M] *= Factor
+		# scaling keeps the ranking in order, unless rounding makes performances equal
+		Ranking = self.__ranking
+		for (Rank, (P, A, M)) in enumerate(Ranking):	Ranking[Rank] = (P * Factor, A, M)
+		if any(Ranking[Rank][:2] > Ranking[Rank+1][:2] for Rank in range(len(Ranking) - 1)):
+			Ranking.sort()
+
+	def __iter__(self):	return iter(self.__members.items())
 	
 	def __len__(self): return len(self.__members)
 		
@@ -136,7 +180,8 @@ class Friend:
 	"""
 	
 	def __init__(self, MaxFriends=1):
-		self.friends = club(MaxFriends)
+		self.followedBy = ()	# those who have self among their friends (reverse index, a set once followed)
+		self.friends = club(MaxFriends, Owner=self)
 	
 	#################################
 	# asymmetrical links            #
@@ -162,7 +207,7 @@ class Friend:
 			return True
 		else:	return False
 			
-	def follows(self, Friend):	return Friend in self.names()
+	def follows(self, Friend):	return self.friends.isMember(Friend)
 		# R = Friend in self.friends.names()
 		# if R: print self.ID, 'is already following', Friend.ID
 	
@@ -197,8 +242,13 @@ class Friend:
 			if not membershipFunction(F):	self.quit_(F)
 		
 	def detach(self):
-		""" The individual quits all its friends	"""
+		""" The individual quits all its friends and is forgotten by those who follow it	"""
 		for F in self:	self.quit_(F)
+		self.forgotten()
+
+	def forgotten(self):
+		" all those who have self among their friends quit it "
+		for Admirer in list(self.followedBy):	Admirer.quit_(self)
 		
 	#################################
 	# symmetrical links             #
@@ -330,6 +380,7 @@ class Follower(Friend):
 		if self.followers is not None:
 			for F in self.followers.names():	self.F_quit_(F)	# self is erased from F's guru list
 			if self.followers.names() != []:	error("Alliances: sticky  followers")
+		self.forgotten()	# remaining links to self are removed
 		
 	def consistency(self):
 		# if self.size() > self.sizeMax():
@@ -25,8 +25,11 @@ if __name__ == '__main__':
 
 from random import randint, sample, shuffle
 
-from Evolife.Ecology.Individual import Individual, EvolifeIndividual
+from Evolife.Ecology.Individual import Individual, EvolifeIndividual, score_changes
+from Evolife.Genetics.DNA import DNA_matrix
+from Evolife.Genetics.Diversity import Diversity
 from Evolife.Ecology.Observer import Examiner		# for statistics
+from Evolife.Tools.Tools import error
 
 class Group:
 	"   list of individuals "
@@ -34,7 +37,13 @@ class Group:
 		self.Scenario = Scenario	# Scenario just holds parameters
 		self.size = 0
 		self.members = []
+		self.memberSet = set()	# for fast membership checks
+		self.__positions = dict()	# index of each member in 'members'
+		self.__positioned = True	# False when positions must be recomputed
+		self.IDs = set()	# IDs of current members
+		self.lastID = 0	# IDs are numbered in increasing order
 		self.ranking = []   # to store a sorted list of individuals in the group
+		self.rankedScores = None	# number of score changes in the population when ranking was computed
 		self.best_score = 0
 		self.ID = ID
 		self.location = 0   # geographical position 
@@ -47,12 +56,11 @@ class Group:
 
 	def free_ID(self, Prefix=None):
 		" returns an available ID "
-		IDs = [m.ID for m in self.members]
-		for ii in range(100000):
-			if Prefix is not None:	ID = '%s%d' % (Prefix, ii)
-			else:		ID = '%d_%d' % (self.ID, ii)	# considering group number as prefix
-			if ID not in IDs:	return ID
-		return -1
+		while True:
+			if Prefix is not None:	ID = '%s%d' % (Prefix, self.lastID)
+			else:		ID = '%d_%d' % (self.ID, self.lastID)	# considering group number as prefix
+			self.lastID += 1
+			if ID not in self.IDs:	return ID	# immigrants may already hold that ID
 			
 	def createIndividual(self, ID=None, Newborn=True):
 		return Individual(self.Scenario, ID=self.free_ID(), Newborn=Newborn)
@@ -62,25 +70,35 @@ class Group:
 		try:	return self.members[Number]
 		except IndexError:	error('Group', 'selecting non-existent individual')
 
-	def isMember(self, indiv):	return	indiv in self.members
+	def isMember(self, indiv):	return	indiv in self.memberSet
+
+	def index(self, member):
+		" returns the position of member in the group "
+		if not self.__positioned:
+			# positions are recomputed only when needed
+			self.__positions = {m: i for (i, m) in enumerate(self.members)}
+			self.__positioned = True
+		try:	return self.__positions[member]
+		except KeyError:	error('Group', 'looking for non-member individual')
 	
 	def update_(self, flagRanking = False, display=False):
 		""" updates various facts about the group
 		"""
 		# removing old chaps
-		for m in self.members[:]:  # must duplicate the list to avoid looping over a modifying list
-			if m.dead():	self.extract(m)
-		self.size = len(self.members)
+		self.bury()
 		if self.size == 0:	return 0
 		# ranking individuals
-		if flagRanking:
+		if flagRanking and self.rankedScores != score_changes():
 			# ranking individuals in the group according to their score
-			self.ranking = self.members[:]	  # duplicates the list, not the elements
-			self.ranking.sort(key=lambda x: x.score(),reverse=True)
+			# (unless no score and no membership has changed since last ranking)
+			Scores = [m.score() for m in self.members]
+			Order = sorted(range(self.size), key=Scores.__getitem__, reverse=True)
+			self.ranking = [self.members[i] for i in Order]
 			if self.ranking != [] and self.ranking[0].score() == 0 and self.ranking[-1] == 0:
 				# all scores are zero
 				shuffle(self.ranking)  # not always the same ones first
-			self.best_score = self.ranking[0].score()
+			self.best_score = Scores[Order[0]]
+			self.rankedScores = score_changes()
 		return self.size
 
 	def statistics(self):
@@ -106,19 +124,56 @@ class Group:
 		# the victim suffers from an accident
 		return self.remove_(memberNbr)
 			
+	def farewell(self, indiv):
+		" action to be performed when an individual leaves the group "
+		indiv.dies()	# let the victim know
+
 	def remove_(self, memberNbr):
 		indiv = self.whoIs(memberNbr)
-		indiv.dies()	# let the victim know
+		self.farewell(indiv)
 		self.size -= 1
-		return self.members.pop(memberNbr)
+		self.members.pop(memberNbr)
+		self.memberSet.discard(indiv)
+		self.rankedScores = None
+		self.IDs.discard(indiv.ID)
+		if memberNbr == len(self.members):	self.__positions.pop(indiv, None)	# others keep their position
+		else:	self.__positioned = False
+		return indiv
 	
 	def extract(self, member):
-		return self.remove_(self.members.index(member))
+		return self.remove_(self.index(member))
+
+	def bury(self):
+		" removes all dead members at once - returns them "
+		return self.remove_several([m for m in self.members if m.dead()])
+
+	def remove_several(self, Leaving):
+		""" removes the members listed in Leaving in one pass - returns them.
+			Remaining members keep their order
+		"""
+		if Leaving:
+			Gone = set(Leaving)
+			self.members[:] = [m for m in self.members if m not in Gone]	# same list, as it may be referenced elsewhere
+			self.memberSet -= Gone
+			self.rankedScores = None
+			for m in Leaving:	self.IDs.discard(m.ID)
+			self.__positioned = False
+			for m in Leaving:	self.farewell(m)
+		self.size = len(self.members)
+		return Leaving
+
+	def kill_several(self, memberNbrs):
+		" suppresses several specified individuals (distinct numbers) - returns them "
+		return self.remove_several([self.whoIs(Nbr) for Nbr in memberNbrs])
 		
 	def receive(self, newcomer):
 		" accepts a new member in the group "
 		if newcomer is not None:
 			self.members.append(newcomer)
+			self.memberSet.add(newcomer)
+			self.rankedScores = None
+			self.IDs.add(newcomer.ID)
+			if self.__positioned:	self.__positions[newcomer] = len(self.members) - 1
 			self.size += 1
 
 	def __len__(self):	return len(self.members)
@@ -143,6 +198,31 @@ class EvolifeGroup(Group):
 		if not Newborn: self.Scenario.new_agent(Indiv, None)  
 		return Indiv
 
+	def createChild(self, Row, GeneValues):
+		" creates a newborn holding DNA Row, whose genes have values GeneValues (see reproduction) "
+		if type(self).createIndividual is not EvolifeGroup.createIndividual:
+			# customized individuals are created as usual and receive their DNA afterwards
+			child = self.createIndividual(Newborn=True)
+			if child is not None:
+				child.set_row(Row)
+				child.update(GeneValues)
+			return child
+		return EvolifeIndividual(self.Scenario, ID=self.free_ID(), Newborn=True, Row=Row, GeneValues=GeneValues)
+
+	def statistics(self):
+		""" updates various statistics about the group.
+			DNA statistics are computed on the whole genome matrix
+		"""
+		self.Examiner.reset()
+		self.Examiner.open_(self.size)
+		for i in self.members:
+			i.observation(self.Examiner)
+		if self.members:
+			Matrix = self.genome_matrix()
+			Counts = Matrix.column_counts()
+			self.Examiner.store_all('DNA', Matrix.nucleotides(), [min(1, C) for C in Counts], Counts)
+		self.Examiner.close_()		# makes statistics for each slot
+
 	def uploadDNA(self, Start):
 		" loads given DNAs into individuals"
 		if Start:	
@@ -158,8 +238,7 @@ class EvolifeGroup(Group):
 		if display:
 			if flagRanking:	self.Scenario.update_positions(self.ranking, self.location)
 			else:			self.Scenario.update_positions(self.members, self.location)
-		# updating social links
-		for m in self.members:	m.checkNetwork(membershipFunction=self.isMember)
+		# social links need no update: links to individuals that leave are removed at once (see Alliances)
 		return size
 		
 	def reproduction(self):
@@ -169,16 +248,26 @@ class EvolifeGroup(Group):
 		# The function 'couples' returns as many couples as children are to be born
 		# The probability of parents to beget children depends on their rank within the group
 		self.update_(flagRanking=True)   # updates individual ranks
-		for C in self.Scenario.couples(self.ranking):
+		Couples = self.Scenario.couples(self.ranking)
+		GenomeMatrix = self.Scenario.Parameter('GenomeMatrix', Default=0)
+		if GenomeMatrix:
+			# the DNA of the whole generation of children is computed at once
+			Children = DNA_matrix(self.Scenario, self.Scenario.geneMap_length())
+			Children.hybrid(Couples)
+			Children.mutate()
+			GeneValues = Children.decode(self.Scenario.Decoder)
+		for (ChildNbr, C) in enumerate(Couples):
 			# making of the child
-			# child = EvolifeIndividual(self.Scenario, ID=self.free_ID(), Newborn=True)			
-			child = self.createIndividual(Newborn=True)			
-			if child is not None:
-				child.hybrid(C[0],C[1]) # child's DNA results from parents' DNA crossover
-				child.mutate()
-				child.update()  # computes the value of genes, as DNA is available only now
-				if self.Scenario.new_agent(child, C):  # let scenario decide something about the newcomer
-					self.receive(child) # adds child to the group
+			if GenomeMatrix:
+				child = self.createChild(Children.rows[ChildNbr], GeneValues[ChildNbr])
+			else:
+				child = self.createIndividual(Newborn=True)
+				if child is not None:
+					child.hybrid(C[0],C[1]) # child's DNA results from parents' DNA crossover
+					child.mutate()
+					child.update()  # computes the value of genes, as DNA is available only now
+			if child is not None and self.Scenario.new_agent(child, C):  # let scenario decide something about the newcomer
+				self.receive(child) # adds child to the group
 
 	def season(self, year):
 		" This function is called at the beginning of each year "
@@ -192,17 +281,30 @@ class EvolifeGroup(Group):
 		indiv.accident()
 		if indiv.dead():	return self.remove_(memberNbr)
 		return None
+
+	def kill_several(self, memberNbrs):
+		" kills or weakens several specified individuals (distinct numbers) - returns the dead "
+		Victims = [self.whoIs(Nbr) for Nbr in memberNbrs]
+		for indiv in Victims:	indiv.accident()
+		return self.remove_several([indiv for indiv in Victims if indiv.dead()])
 			
-	def remove_(self, memberNbr):
-		indiv = self.whoIs(memberNbr)
+	def farewell(self, indiv):
 		self.Scenario.remove_agent(indiv)   # let scenario know
-		return Group.remove_(self, memberNbr)
+		Group.farewell(self, indiv)
 		
 	def life_game(self):
 		# Let's play the game as defined in the scenario
 		self.Scenario.life_game(self.members)
 		# life game is supposed to change individual scores and life points
 
+	def genome_matrix(self):
+		" returns the DNA of all members as a DNA_matrix "
+		return DNA_matrix(self.Scenario, self.Scenario.geneMap_length(), self.members)
+
+	def diversity(self):
+		" returns measures of genetic diversity within the group (see Diversity) "
+		return Diversity(self.genome_matrix()).summary()
+
 	def get_average(self):
 		" computes an average individual "
 		Avg_DNA = [int(round(B)) for B in self.Examiner.storages['DNA'].average]
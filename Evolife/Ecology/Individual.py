@@ -27,6 +27,10 @@ from Evolife.Genetics.Genome import Genome
 from Evolife.Ecology.Phenotype import Phenome
 from Evolife.Ecology.Alliances import Follower as SocialLink
 
+ScoreChanges = 0	# counts score modifications in the whole population (to know when rankings are outdated)
+
+def score_changes():	return ScoreChanges
+
 class Individual:
 	"   class Individual: basic individual "
 
@@ -65,7 +69,10 @@ class Individual:
 	
 	def score(self, bonus=0, FlagSet=False):
 		if FlagSet:	self.__score = bonus
-		else:		self.__score += bonus
+		elif bonus:	self.__score += bonus
+		else:		return self.__score	# mere reading
+		global ScoreChanges
+		ScoreChanges += 1
 		return self.__score
 
 	def signature(self):
@@ -92,11 +99,23 @@ class Individual:
 				
 				
 class EvolifeIndividual(Individual, Genome, Phenome, SocialLink):
-	"   Individual + genome + phenome + social links "
+	"""   Individual + genome + phenome + social links
+		Attributes are stored in slots: no instance dictionary is allocated
+		unless a scenario adds attributes of its own.
+	"""
 
-	def __init__(self, Scenario, ID=None, Newborn=True, MaxFriends=0):
+	__slots__ = ('Scenario', 'ID', 'age', 'location', '_Individual__score', 'LifePoints',	# Individual
+				 'nb_nucleotides', '_DNA__dna', 'genome',	# Genome
+				 'PheneColumns', 'Phenes',	# Phenome
+				 'followedBy', 'friends', 'followers')	# SocialLink
+
+	def __init__(self, Scenario, ID=None, Newborn=True, MaxFriends=0, Row=None, GeneValues=None):
 		Individual.__init__(self, Scenario, ID=ID, Newborn=Newborn)
-		if not Newborn:
+		if Row is not None:
+			# DNA and gene values of newborns may be computed for a whole generation (see DNA_matrix)
+			Genome.__init__(self, self.Scenario, Row=Row)
+			Genome.update(self, GeneValues)
+		elif not Newborn:
 			Genome.__init__(self, self.Scenario)
 			Genome.update(self)  # gene values are read from DNA
 		else:
@@ -107,9 +126,7 @@ class EvolifeIndividual(Individual, Genome, Phenome, SocialLink):
 	def observation(self, GroupExaminer):
 		Individual.observation(self, GroupExaminer)
 		GroupExaminer.store('Genomes', Genome.signature(self))
-		GroupExaminer.store('DNA', list(self.get_DNA()), Numeric=True)
 		GroupExaminer.store('Phenomes', Phenome.signature(self))
-		GroupExaminer.store('Network', (self.ID, [T.ID for T in SocialLink.signature(self)]), Numeric=False)
 		GroupExaminer.store('Field', (self.ID, self.location), Numeric=False)
 
 	def dies(self):
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+##############################################################################
+# EVOLIFE  http://evolife.telecom-paris.fr             Jean-Louis Dessalles  #
+# Telecom Paris  2021                                      www.dessalles.fr  #
+# -------------------------------------------------------------------------- #
+# License:  Creative Commons BY-NC-SA                                        #
+##############################################################################
+
+
+##############################################################################
+#  Network                                                                   #
+##############################################################################
+
+""" EVOLIFE: Module Network:
+		Snapshots of the social network (see Alliances).
+		Links are stored in compressed sparse row (CSR) form:
+		individuals are numbered 0..N-1, and the friends of node i
+		are Targets[Offsets[i]:Offsets[i+1]], best friend first.
+"""
+
+import sys
+if __name__ == '__main__':  sys.path.append('../..')  # for tests
+
+from array import array
+from collections import Counter
+
+# Measures that can be displayed as curves (see Observer), with their legends
+Measures = {'Links':			'Number of social links in the population',
+			'MeanDegree':		'Average number of friends per individual',
+			'Reciprocity':		'Percentage of social links that are reciprocated',
+			'Components':		'Number of connected components with at least one link',
+			'LargestComponent':	'Percentage of individuals in the largest connected component'}
+
+
+class NetworkSnapshot:
+	""" class NetworkSnapshot: social links frozen as CSR arrays.
+		IDs[i] is the ID of node i.
+	"""
+
+	def __init__(self, IDs, Offsets, Targets):
+		self.IDs = IDs
+		self.Offsets = Offsets
+		self.Targets = Targets
+
+	def size(self):		return len(self.IDs)
+
+	def nb_links(self):	return len(self.Targets)
+
+	def friends(self, Node):
+		" node numbers of Node's friends, best friend first "
+		return self.Targets[self.Offsets[Node]:self.Offsets[Node+1]]
+
+	def out_degrees(self):
+		" number of friends of each node "
+		Offsets = self.Offsets
+		return [Offsets[i+1] - Offsets[i] for i in range(len(self.IDs))]
+
+	def in_degrees(self):
+		" number of times each node is chosen as a friend "
+		Degrees = array('l', [0]) * len(self.IDs)
+		for T in self.Targets:	Degrees[T] += 1
+		return Degrees
+
+	def degree_distribution(self, Incoming=False):
+		" Distribution[d] is the number of nodes having d friends (or d followers if Incoming) "
+		Counts = Counter(self.in_degrees() if Incoming else self.out_degrees())
+		Distribution = [0] * (max(Counts, default=-1) + 1)
+		for (Degree, Nb) in Counts.items():	Distribution[Degree] = Nb
+		return Distribution
+
+	def reciprocity(self):
+		" proportion of links i->j such that j->i also exists "
+		if not self.Targets:	return 0
+		N = len(self.IDs)
+		Offsets = self.Offsets
+		Links = set()
+		for i in range(N):
+			Links.update([i * N + T for T in self.Targets[Offsets[i]:Offsets[i+1]]])
+		Mutual = sum([1 for L in Links if (L % N) * N + L // N in Links])
+		return Mutual / float(len(self.Targets))
+
+	def components(self):
+		""" sizes of connected components, largest first.
+			Links are taken as undirected; isolated nodes are components of size 1
+		"""
+		N = len(self.IDs)
+		Root = array('l', range(N))	# union-find forest
+		def find(Node):
+			while Root[Node] != Node:
+				Root[Node] = Root[Root[Node]]
+				Node = Root[Node]
+			return Node
+		Offsets = self.Offsets
+		for i in range(N):
+			for T in self.Targets[Offsets[i]:Offsets[i+1]]:
+				Root[find(i)] = find(T)
+		return sorted(Counter([find(i) for i in range(N)]).values(), reverse=True)
+
+	def summary(self):
+		" returns all measures as a dictionary (see Measures) "
+		Sizes = self.components()
+		N = max(1, len(self.IDs))
+		return {'Links':			len(self.Targets),
+				'MeanDegree':		len(self.Targets) / float(N),
+				'Reciprocity':		100 * self.reciprocity(),
+				'Components':		len([S for S in Sizes if S > 1]),
+				'LargestComponent':	100 * (Sizes[0] if Sizes else 0) / float(N)}
+
+	def links(self):
+		" (ID, [friend IDs]) pairs, as in former network observations "
+		IDs = self.IDs
+		return [(IDs[i], [IDs[T] for T in self.friends(i)]) for i in range(len(IDs))]
+
+	def best_friends(self):
+		" (ID, best friend's ID) pairs for individuals that have friends "
+		IDs = self.IDs
+		Offsets = self.Offsets
+		return [(IDs[i], IDs[self.Targets[Offsets[i]]]) for i in range(len(IDs)) if Offsets[i+1] > Offsets[i]]
+
+	def __len__(self):	return len(self.IDs)
+
+	def __str__(self):
+		return ' '.join(['%s: %.2f' % (M, V) for (M, V) in self.summary().items()])
+
+
+def snapshot(Individuals):
+	""" freezes the social links of Individuals (see Alliances).
+		Friends that are not among Individuals are ignored
+	"""
+	Individuals = list(Individuals)
+	Nodes = dict([(indiv, Node) for (Node, indiv) in enumerate(Individuals)])
+	Offsets = array('l', [0])
+	Targets = array('l')
+	for indiv in Individuals:
+		Targets.extend([Nodes[F] for F in indiv.social_signature() if F in Nodes])
+		Offsets.append(len(Targets))
+	return NetworkSnapshot([indiv.ID for indiv in Individuals], Offsets, Targets)
+
+def snapshot_from_links(Links):
+	" builds a snapshot from (ID, [friend IDs]) pairs, as produced by former network observations "
+	Links = list(Links)
+	Nodes = dict([(ID, Node) for (Node, (ID, Friends)) in enumerate(Links)])
+	Offsets = array('l', [0])
+	Targets = array('l')
+	for (ID, Friends) in Links:
+		Targets.extend([Nodes[F] for F in Friends if F in Nodes])
+		Offsets.append(len(Targets))
+	return NetworkSnapshot([ID for (ID, Friends) in Links], Offsets, Targets)
+
+
+###############################
+# Local Test                  #
+###############################
+
+if __name__ == "__main__":
+	print(__doc__)
+	print(NetworkSnapshot.__doc__ + '\n')
+	Net = snapshot_from_links([('A', ['B', 'C']), ('B', ['A']), ('C', []), ('D', ['E']), ('E', [])])
+	print(Net.links())
+	print('out-degrees:', Net.degree_distribution(), 'in-degrees:', Net.degree_distribution(Incoming=True))
+	print('components:', Net.components())
+	print(Net)
+
+
+__author__ = 'Dessalles'
@@ -24,13 +24,17 @@ if __name__ == '__main__':  sys.path.append('../..')
 import functools 
 from time import strftime
 from Evolife.Tools.Tools import transpose, error
+from Evolife.Genetics.Diversity import Measures as DiversityMeasures
+from Evolife.Ecology.Network import Measures as NetworkMeasures
 
 ####################################################################################
 #	Generic_Observer --> interface between simulation and window system
 #	Experiment_Observer --> idem + headers to store curves
 #
 #	Storage --> stores vectors
+#	WeightedStorage --> each vector stands for several identical items
 #	Examiner --> different Storages, one per slot
+#	WeightedExaminer --> Examiner with WeightedStorages
 #	Meta_Examiner --> stores similar Examiners with sames slots + statistics
 #
 #	Observer --> Meta_Examiner + Experiment_Observer
@@ -148,7 +152,29 @@ class Storage:
 class NumericStorage(Storage):
 	" Storage + basic statistics "
 
+	def reset(self, length = -1):
+		Storage.reset(self, length)
+		self.columns = None	# best and total of each coordinate, when known in advance (see store_all)
+
+	def store_all(self, vectors, best, totals):
+		" stores all vectors at once, with the best and total values of each coordinate "
+		if not self.open:
+			error('Observer: ',self.Name+': not open')
+		if self.storage:	error('Observer: ', self.Name + ': vectors already stored one by one')
+		if self.itemLength > 0 and len(best) != self.itemLength:
+			error('Observer: ', self.Name + ': Inconsistent item length')
+		self.itemLength = len(best)
+		self.storage = list(vectors)
+		self.columns = (best, totals)
+
 	def statistics(self):
+		if self.columns is not None:
+			(best, totals) = self.columns
+			self.best = list(best)
+			if self.length <= 0:
+				return (0,0,0,[])
+			self.average = [T / float(len(self.storage)) for T in totals]
+			return (len(self.storage), self.best, self.average, tuple(self.get_data()))
 		TStorage = transpose(self.storage)
 		self.best = list(map(lambda x: max(x), TStorage))
 		if self.length <= 0:
@@ -157,6 +183,33 @@ class NumericStorage(Storage):
 
 		return (len(self.storage), self.best, self.average, tuple(self.get_data()))
 	   
+class WeightedStorage(NumericStorage):
+	""" NumericStorage in which each vector stands for several identical items
+		(e.g. individuals with same genotype) - length counts items, not vectors
+	"""
+
+	def reset(self, length = -1):
+		NumericStorage.reset(self, length)
+		self.weights = []
+
+	def store(self, vector, Weight=1):
+		NumericStorage.store(self, vector)
+		self.weights.append(Weight)
+
+	def statistics(self):
+		TStorage = transpose(self.storage)
+		self.best = list(map(lambda x: max(x), TStorage))
+		if self.length <= 0:
+			return (0,0,0,[])
+		self.average = [sum([w * v for (w, v) in zip(self.weights, x)], 0.0) / self.length for x in TStorage]
+		return (self.length, self.best, self.average, tuple(self.get_data()))
+
+	def close_(self):
+		if not self.open:   error('Observer: ', self.Name+': closing while not open')
+		self.length = sum(self.weights)
+		self.statistics()	# computes statistics 
+		self.open = False
+
 class Examiner:
 	""" Groups several storages in different slots with different names.
 		Use by calling in sequence:
@@ -189,6 +242,13 @@ class Examiner:
 			self.storages[StorageName].open_()
 		self.storages[StorageName].store(vector)
 
+	def store_all(self, StorageName, vectors, best, totals):
+		" stores all vectors of a numeric slot at once (see NumericStorage) "
+		if StorageName not in self.storages:
+			self.storages[StorageName] = NumericStorage(StorageName)
+			self.storages[StorageName].open_()
+		self.storages[StorageName].store_all(vectors, best, totals)
+
 	def statistics(self):
 		for S in self.storages:
 			self.storages[S].statistics()
@@ -212,6 +272,23 @@ class Examiner:
 		return self.Name + ':\n' + '\n'.join([self.display(S) for S in self.storages])
 					
 
+class WeightedExaminer(Examiner):
+	""" Examiner in which each numeric vector stands for Weight identical items
+	"""
+
+	def store(self, StorageName, vector, Numeric=True, Weight=1):
+		" stores a data vector representing Weight items into a slot named StorageName "
+		if StorageName not in self.storages:
+			# creating a new slot
+			if Numeric:
+				self.storages[StorageName] = WeightedStorage(StorageName)
+			else:
+				self.storages[StorageName] = Storage(StorageName)
+			self.storages[StorageName].open_()
+		if Numeric:	self.storages[StorageName].store(vector, Weight)
+		else:		self.storages[StorageName].store(vector)
+		
+
 class Meta_Examiner(Storage):
 	""" Meta storage: stores several lower-level examiners
 		having same slots and makes weighted statistics for each slot
@@ -496,7 +573,11 @@ class EvolifeObserver(Observer):
 			if not Legend:
 				if Name in self.Scenario.get_gene_names():	Legend = 'Average value of gene %s in the population' % Name
 				elif Name in self.Scenario.phenemap():		Legend = 'Average value of phene %s in the population' % Name
+				elif Name in DiversityMeasures:		Legend = DiversityMeasures[Name]
+				elif Name in NetworkMeasures:		Legend = NetworkMeasures[Name]
 			self.curve(Name=Name, Color=Colour, Legend=Legend)
+		# genetic diversity is computed only if displayed
+		self.DiversityCurves = [C for C in self.Curves if C in DiversityMeasures]
 
 	def GetPlotOrders(self):
 		""" Gets the curves to be displayed from the scenario and
@@ -515,6 +596,12 @@ class EvolifeObserver(Observer):
 			elif Curve in self.Scenario.phenemap():
 				# displaying average values of phenes
 				value = self.Statistics['Phenomes']['average'][self.Scenario.phenemap().index(Curve)]
+			elif Curve in DiversityMeasures:
+				# displaying genetic diversity within groups (see Population)
+				value = self.get_info('Diversity', default=dict()).get(Curve, 0)
+			elif Curve in NetworkMeasures:
+				# displaying social network measures (see Population)
+				value = self.get_info('NetworkStatistics', default=dict()).get(Curve, 0)
 			else:	# looking for Curve in Scenario's local variables
 				if Curve in dir(self.Scenario):
 					try:	value = int(getattr(self.Scenario, Curve))
@@ -533,6 +620,12 @@ class EvolifeObserver(Observer):
 			if Best is not None:	return Best
 		return Observer.get_info(self, Slot, default=default)
 
+	def get_data(self, Slot, Consumption=True):
+		if Slot == 'Network':
+			# snapshot of social links (see Network)
+			return self.get_info('Network')
+		return Observer.get_data(self, Slot, Consumption=Consumption)
+
 	def TextDisplay(self, Str=""):
 		" stores a string that will be displayed at appropriate time "
 		if not self.BatchMode:
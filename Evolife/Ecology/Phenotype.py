@@ -12,7 +12,8 @@
 ##############################################################################
 
 """ EVOLIFE: Module Phenotype:
-		Definition of phenotype as non inheritable characters
+		Definition of phenotype as non inheritable characters.
+		A phenome is a row of values, one column per phene of the scenario's phenemap.
 """
 
 import sys
@@ -49,27 +50,58 @@ class Phene:
 
 	def __str__(self):
 		return self.Name + '=' + "%d" % self.value()
-	
+
+
+DrawBlock = 4096	# random phene values are drawn by blocks
+RandomValues = []	# values drawn in advance
+
+def random_values(Nb):
+	" returns Nb random phene values, drawn by blocks "
+	global RandomValues
+	if Nb == 0:	return []
+	if len(RandomValues) < Nb:
+		RandomValues = random.choices(range(Phene.MaxPheneValue + 1), k=max(Nb, DrawBlock))
+	Values = RandomValues[-Nb:]
+	del RandomValues[-Nb:]
+	return Values
+
+Columns = dict()	# column of each phene name, for each phenemap
+
+def phene_columns(PheneNames):
+	" returns a dictionary giving the column of each phene name (shared by all phenomes) "
+	Key = tuple(PheneNames)
+	if Key not in Columns:	Columns[Key] = dict([(PN, Col) for (Col, PN) in enumerate(Key)])
+	return Columns[Key]
+
 class Phenome:
-	"   class Phenome: set of non inheritable characteristics "
+	"""   class Phenome: set of non inheritable characteristics
+		Phenes holds the values in phenemap order (see phene_columns)
+	"""
 
 	def __init__(self, Scenario, FlagRandom = True):
 		self.Scenario = Scenario
-		self.Phenes = {PN:Phene(PN,FlagRandom)
-							for PN in self.Scenario.phenemap()}
+		self.PheneColumns = phene_columns(self.Scenario.phenemap())
+		if FlagRandom:	self.Phenes = random_values(len(self.PheneColumns))
+		else:	self.Phenes = [0] * len(self.PheneColumns)
 
 	def Phene_value(self, name, Value=None, Levelling=False):
 		" reads or sets the value of a phene "
-		return self.Phenes[name].value(Value, Levelling)
+		Col = self.PheneColumns[name]
+		if Value is None:	return self.Phenes[Col]
+		if Value <= Phene.MaxPheneValue:	self.Phenes[Col] = Value
+		elif Levelling:	self.Phenes[Col] = Phene.MaxPheneValue
+		else:	error("Phenotype: ", "Maximum value exceeded: %f" % Value)
+		return self.Phenes[Col]
 
 	def Phene_relative_value(self, name):
-		return self.Phenes[name].relative_value()
+		return (100.0 * self.Phenes[self.PheneColumns[name]]) / Phene.MaxPheneValue
 	
 	def signature(self):
-		return [self.Phenes[PN].relative_value() for PN in self.Scenario.phenemap()]
+		Scale = 100.0 / Phene.MaxPheneValue
+		return [V * Scale for V in self.Phenes]
 				
 	def __str__(self):
-		return 'Phenotype:\n ' + ' <> '.join([Ph.__str__() for Ph in self.Phenes.values()])
+		return 'Phenotype:\n ' + ' <> '.join(['%s=%d' % (PN, self.Phenes[Col]) for (PN, Col) in self.PheneColumns.items()])
 
 
 
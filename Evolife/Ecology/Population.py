@@ -23,10 +23,12 @@ if __name__ == '__main__':  # for tests
 	from Evolife.Scenarii.MyScenario import InstantiateScenario
 	InstantiateScenario('Cooperation','../Evolife')
 
-from random import randint, choice
+from random import randint, choices, sample
 
 from Evolife.Tools.Tools import error
 from Evolife.Ecology.Group import Group, EvolifeGroup			 # definition of groups
+from Evolife.Ecology.Alliances import link_changes
+from Evolife.Ecology.Network import snapshot
 
 class Population:	
 	"""   class Population: list of Groups
@@ -65,6 +67,18 @@ class Population:
 			else:	winner -= gr.size
 		error(f"Population: wrong population size: {self.popSize}")
 
+	def distribute(self, Numbers):
+		""" splits sorted numbers of individuals in the population
+			into (group, list of member numbers in that group), in one pass
+		"""
+		Start = 0	# number of the first member of the current group in the population
+		Next = 0
+		for gr in self.groups:
+			First = Next
+			while Next < len(Numbers) and Numbers[Next] < Start + gr.size:	Next += 1
+			if Next > First:	yield (gr, [N - Start for N in Numbers[First:Next]])
+			Start += gr.size
+
 	def season(self):
 		self.year += 1		  # keeps track of time
 		self.Observer.season(self.year)
@@ -75,11 +89,16 @@ class Population:
 		if len(self.groups) < 2 or self.Scenario.Parameter('MigrationRate', Default=0) == 0:
 			return	# no migration if only one group
 		migrants = int(self.Scenario.Parameter('MigrationRate') * self.popSize/100.0 + 0.5)
-		while migrants:
-			(gr_out, migrant) = self.lottery() # choosing the migrant
-			(gr_in,dummy) = self.lottery()	# choosing where to go
-			gr_in.receive(gr_out.remove_(migrant))  # symbolically murdered, and then born-again
-			migrants -= 1
+		migrants = min(migrants, self.popSize)
+		# all migrants are chosen at once, and their destinations too (proportionally to group size)
+		Migrants = sorted(sample(range(self.popSize), migrants))
+		Destinations = choices(self.groups, weights=[gr.size for gr in self.groups], k=migrants)
+		Leaving = []
+		for (gr_out, Numbers) in list(self.distribute(Migrants)):
+			# symbolically murdered...
+			Leaving += gr_out.remove_several([gr_out.whoIs(N) for N in Numbers])
+		for (migrant, gr_in) in zip(Leaving, Destinations):
+			gr_in.receive(migrant)	# ... and then born-again
 
 	def group_splitting(self):
 		""" groups that are too big are split in two,
@@ -92,9 +111,9 @@ class Population:
 			if gr.size > self.groupMaxSize:
 				effectif = int(gr.size/2.0 + .5)
 				newgroup = self.createGroup(ID=len(self.groups)+1)		# create empty group
-				while effectif:
-					newgroup.receive(gr.remove_(randint(0,gr.size-1)))   # symbolically murdered, and then born-again
-					effectif -= 1
+				# half of the members leave at once
+				for indiv in gr.remove_several(sample(gr.members, effectif)):	# symbolically murdered,
+					newgroup.receive(indiv)	# and then born-again
 				newgroup.update_()
 				self.groups.append(newgroup)
 
@@ -106,25 +125,23 @@ class Population:
 		for gr in grps:
 			if gr.size < self.Scenario.Parameter('GroupMinSize'):
 				self.groups.remove(gr)
-				self.popSize -= gr.size	# necessary for lottery()
-				# for dummy in gr.members:
-				for dummy in list(gr):
-					try:
-						gr_in = choice(self.groups) # dispersed members join groups independently of their size
-					except IndexError:
-						return  # dying population 
-##					(gr_in,dummy) = self.lottery() # choosing where to go
-					gr_in.receive(gr.remove_(0))  # symbolically murdered, and then born-again
-					self.popSize += 1
+				if self.groups == []:
+					self.popSize -= gr.size
+					return  # dying population 
+				# dispersed members join groups independently of their size
+				Destinations = choices(self.groups, k=gr.size)
+				for (indiv, gr_in) in zip(gr.remove_several(list(gr.members)), Destinations):	# symbolically murdered,
+					gr_in.receive(indiv)	# and then born-again
 
 	def limit(self):
 		" randomly kills individuals until size is reached "
 ##		MaxLives =  self.Scenario.Parameter('SelectionPressure')
 		self.update()
 		while self.popSize > self.Scenario.Parameter('PopulationSize'):
-			(gr,Unfortunate) = self.lottery()
-			if gr.kill(Unfortunate) is not None:
-				self.popSize -= 1
+			# as many distinct individuals as in excess are drawn at once
+			Unfortunates = sorted(sample(range(self.popSize), self.popSize - self.Scenario.Parameter('PopulationSize')))
+			for (gr, Numbers) in list(self.distribute(Unfortunates)):
+				self.popSize -= len(gr.kill_several(Numbers))
 		self.update(display=True)
 		
 	def update(self, flagRanking = False, display=False):
@@ -218,12 +235,43 @@ class EvolifePopulation(Population):
 
 	def createGroup(self, ID=0, Size=0):
 		return EvolifeGroup(self.Scenario, ID=ID, Size=Size)
+
+	def statistics(self, Complete=True, Display=False):
+		" Updates statistics about the population + genetic diversity when displayed + social network "
+		Population.statistics(self, Complete=Complete, Display=Display)
+		try:	Watched = self.Observer.DiversityCurves
+		except AttributeError:	Watched = False	# observer unaware of diversity
+		if Complete and Watched:	self.diversity()
+		if Complete and link_changes():	self.network()	# no snapshot as long as no link has been created
+
+	def diversity(self):
+		" computes genetic diversity within groups and records averages weighted by group size "
+		GroupDiversity = [(gr.size, gr.diversity()) for gr in self.groups]
+		Average = dict()
+		for (Size, Summary) in GroupDiversity:
+			for Measure in Summary:
+				Average[Measure] = Average.get(Measure, 0) + Size * Summary[Measure]
+		for Measure in Average:	Average[Measure] /= float(max(1, self.popSize))
+		self.Observer.recordInfo('GroupDiversity', [Summary for (Size, Summary) in GroupDiversity])
+		self.Observer.recordInfo('Diversity', Average)
+		return Average
+
+	def network(self):
+		" freezes social links into a snapshot (see Network) and records network measures "
+		Snapshot = snapshot(self.members())
+		Summary = Snapshot.summary()
+		self.Observer.recordInfo('Network', Snapshot)
+		self.Observer.recordInfo('NetworkStatistics', Summary)
+		return Summary
 		
 	def reproduction(self):
 		" launches reproduction in groups "
 		for gr in self.groups:
 			gr.reproduction()
 		self.update()
+		if self.Scenario.GenePool is not None:
+			# DNA of dead individuals need not be kept
+			self.Scenario.GenePool.purge(indiv.get_row() for gr in self.groups for indiv in gr)
 				
 	def life_game(self):
 		for gr in self.groups:
@@ -25,111 +25,149 @@ if __name__ == '__main__':
 	InstantiateScenario('Cooperation','../Evolife')
 
 import random
-# try:	import numpy; NUMPY = True; print('Loading Numpy')
-# except ImportError:	NUMPY = False
-NUMPY=False	# slower with Numpy !!
+from collections import Counter
+from functools import lru_cache, reduce
+from operator import xor
 
 import Evolife.Tools.Tools as Tools
+from Evolife.Tools.EvolifeGray import gray_decode, gray_decode_all
+
+# coding modes (same numbers as the old numeric designation of coding)
+(NOCODING, WEIGHTED, UNWEIGHTED, GRAY) = range(-1,3)
+
+def coding_mode(coding):
+	" returns the number of a coding mode given by its name ('Weighted'...) or by its number "
+	if coding in range(-1,3):	return coding
+	try:	return ['nocoding', 'weighted', 'unweighted', 'gray'].index(coding.lower()) - 1
+	except (ValueError, AttributeError):	Tools.error("DNA", 'unknown binary coding mode: %s' % str(coding))
+
+
+def _hybrid(parent1, parent2, Nb_nucleotides, number_crossover):
+	" splices two packed DNA strings at random crossover points "
+	#   computing random crossover points
+	if Nb_nucleotides > 1:
+		Loci_crossover = sorted(random.sample(range(1,Nb_nucleotides), number_crossover))
+	else:
+		Loci_crossover = []
+	# the child's DNA will be read alternatively from parent1 and parent2
+	if random.randint(0,1):	# starting indifferently from mother or father
+		parent1, parent2 = parent2, parent1	 # swapping parents
+	# Mask selects the stretches of DNA that are read from parent2:
+	# each crossover point flips the mask from that locus to the end
+	Mask = 0
+	for cut_point in Loci_crossover:
+		Mask ^= (1 << (Nb_nucleotides - cut_point)) - 1
+	return parent1 ^ ((parent1 ^ parent2) & Mask)
+
+@lru_cache(maxsize=8)
+def _tail_masks(Nb_nucleotides):
+	" Tails[c] selects nucleotides from locus c to the end of a packed DNA string "
+	return tuple((1 << (Nb_nucleotides - c)) - 1 for c in range(Nb_nucleotides + 1))
+
+_Nucleotides = bytes.maketrans(b'01', b'\x00\x01')	# character -> nucleotide
+
+def _unpack(Row, Nb_nucleotides):
+	" returns a packed DNA string as a tuple of 0s and 1s (unpacked in a single pass) "
+	if Nb_nucleotides == 0:	return ()
+	return tuple(format(Row, '0%db' % Nb_nucleotides).encode('ascii').translate(_Nucleotides))
+
+def _mutate(Row, Nb_nucleotides, mutation_rate):
+	" flips random bits of a packed DNA string - returns the new string and the number of mutations "
+	mutation_number = Tools.chances(mutation_rate/1000.0, Nb_nucleotides)
+##        mutation_number =  (mutation_rate * self.nb_nucleotides) / 1000
+##        if randint(1,1000) < 1 + ((mutation_rate * self.nb_nucleotides) % 1000) :
+##            mutation_number += 1
+	# performing mutations
+	for mutation in range(mutation_number):
+		pos = random.randint(0, Nb_nucleotides - 1)
+		Row ^= 1 << (Nb_nucleotides - 1 - pos)
+	return (Row, mutation_number)
+
+def _read(Row, Nb_nucleotides, start, end, coding):
+	" reads a chunk of a packed DNA string - coding is expected as a number "
+	if coding == NOCODING or start >= end:	return 0
+	# the chunk is shifted to the right and isolated by a mask
+	value = (Row >> (Nb_nucleotides - end)) & ((1 << (end - start)) - 1)
+	if coding == UNWEIGHTED:
+		return Tools.popcount(value)
+	if coding == GRAY:
+		value = gray_decode(value)
+	return value
+
 
 class DNA:
-	"""   class DNA: individuals' 'DNA' defined as a string of bits
+	"""   class DNA: individuals' 'DNA' defined as a string of bits.
+		Bits are packed into a single integer: the first nucleotide
+		is the most significant bit, the last one is bit 0.
 	"""
 
-	def __init__(self, Scenario, Nb_nucleotides):
+	def __init__(self, Scenario, Nb_nucleotides, Row=None):
 		self.Scenario = Scenario
 		self.nb_nucleotides = Nb_nucleotides
-		self.__dna = []
-		Fill = self.Scenario.Parameter('DNAFill', Default=-1)	# 0 or 1 or -1=random
-		for pos in range(self.nb_nucleotides):
-			if (Fill==1):	self.__dna.append(1)
-			elif (Fill==0):	self.__dna.append(0)
-			else:			self.__dna.append(random.randint(0,1))
-		if NUMPY:	self.__dna = numpy.array(self.__dna)	# doesn't seem to be very efficient !
+		Fill = self.Scenario.Parameter('DNAFill', Default=-1) if Row is None else None	# 0 or 1 or -1=random
+		if Row is not None:	self.set_row(Row)	# DNA already computed (see DNA_matrix)
+		elif Fill == 1:	self.set_row((1 << self.nb_nucleotides) - 1)
+		elif Fill == 0:	self.set_row(0)
+		else:			self.set_row(random.getrandbits(self.nb_nucleotides) if self.nb_nucleotides else 0)
 			
 	def DNAfill(self, Nucleotides):
 		" fills the DNA with given Nucleotides "
-		self.__dna = Nucleotides[:] # important: make a ground copy
 		if len(Nucleotides) > 0 and len(Nucleotides) != self.nb_nucleotides:
 			Tools.error('DNA: initialization','Provided genome length does not match gene map')
 		if len(Nucleotides) > 0 and not set(Nucleotides) <= set([0,1]):
 			Tools.error('DNA: initialization','Provided genome is not binary')
+		self.set_row(int(''.join(map(str, Nucleotides)), 2) if len(Nucleotides) else 0)
 		
 	def hybrid(self, mother, father, number_crossover = -1):
 		" builds the child's DNA from the parents' DNA "
-		#   computing random crossover points
 		if number_crossover < 0:	number_crossover = self.Scenario.Parameter('NbCrossover')
-		if self.nb_nucleotides > 1:
-			Loci_crossover = random.sample(range(1,self.nb_nucleotides), number_crossover)
-			Loci_crossover = [0] + sorted(Loci_crossover)
-		else:
-			Loci_crossover = [0]
-		Loci_crossover.append(self.nb_nucleotides)
-		# print Loci_crossover
-		# the child's DNA will be read alternatively from parent1 and parent2
-		parent1 = mother.__dna
-		parent2 = father.__dna
-		if random.randint(0,1):	# starting indifferently from mother or father
-			parent1, parent2 = parent2, parent1	 # swapping parents
-		self.__dna = []
-		for cut_point in range(len(Loci_crossover)-1):
-			self.__dna += list(parent1[Loci_crossover[cut_point]:Loci_crossover[cut_point+1]])
-			parent1, parent2 = parent2, parent1	 # swapping parents		
-		if NUMPY:	self.__dna = numpy.array(self.__dna)
+		self.set_row(_hybrid(mother.__dna, father.__dna, self.nb_nucleotides, number_crossover))
 
 	def mutate(self, mutation_rate = -1):
 		" computing the expected number of mutations "
 		if mutation_rate < 0:	mutation_rate = self.Scenario.Parameter('MutationRate')
-		mutation_number = Tools.chances(mutation_rate/1000.0, self.nb_nucleotides)
-##        mutation_number =  (mutation_rate * self.nb_nucleotides) / 1000
-##        if randint(1,1000) < 1 + ((mutation_rate * self.nb_nucleotides) % 1000) :
-##            mutation_number += 1
-		# performing mutations
-		for mutation in range(mutation_number):
-			pos = random.randint(0, self.nb_nucleotides - 1)
-			self.__dna[pos] = 1 - self.__dna[pos]
+		(Row, mutation_number) = _mutate(self.__dna, self.nb_nucleotides, mutation_rate)
+		if mutation_number:	self.set_row(Row)	# a mutated string is a new string
 		return mutation_number
 
 	def read_DNA(self, start, end, coding = None):
 		" reads a chunk of DNA "
 		if coding == None:	coding = self.Scenario.Parameter('GeneCoding')
-		if coding in range(-1,3):
-			# old numeric designation of coding
-			coding = ['Nocoding', 'Weighted', 'Unweighted', 'Gray'][coding+1]
-		value = 0
-		coding = coding.lower()
-		if coding == 'nocoding':
+		coding = coding_mode(coding)
+		if coding == NOCODING:
 			return 0
-		if coding not in ['weighted', 'unweighted', 'gray']:
-			Tools.error("DNA", 'unknown binary coding mode')
-		try:
-			for pos in range(start,end):
-				if coding == 'unweighted':
-					value += self.__dna[pos]
-				else:   # Weighted or Gray
-##                    value += self.__dna[pos]* 2 ** (end - 1 - pos)
-					value += (self.__dna[pos] << (end - 1 - pos))
-			if coding == 'gray':
-				value = Tools.GrayTable.Gray2Int(value)
-			return(value)
-		except IndexError:
+		if start < 0 or end > self.nb_nucleotides:
 			Tools.error("DNA", "reading outside the DNA")
+		return _read(self.__dna, self.nb_nucleotides, start, end, coding)
+
+	def same_DNA(self, alter):
+		" checks whether two individuals have identical DNA "
+		# interned strings (see DNA_pool) are merely compared by reference
+		return self.__dna is alter.__dna or self.__dna == alter.__dna
 
 	def hamming(self, alter):
 		" computes the Hamming distance between two DNA strings "
-		distance = 0
-		for pos in range(self.nb_nucleotides):
-			distance += (self.__dna[pos] != alter.__dna[pos])
-		return distance
+		return Tools.popcount(self.__dna ^ alter.__dna)
 
 	def get_DNA(self):
 		# returns DNA as a tuple
-		return tuple(self.__dna)
+		return _unpack(self.__dna, self.nb_nucleotides)
+
+	def get_row(self):
+		" returns DNA in its packed form (see DNA_matrix) "
+		return self.__dna
+
+	def set_row(self, Row):
+		" fills DNA from its packed form (see DNA_matrix) "
+		Pool = getattr(self.Scenario, 'GenePool', None)
+		if Pool is not None:	Row = Pool.intern(Row)	# identical strings are shared
+		self.__dna = Row
 
 	def __str__(self, compact=0):
 		if compact:
-				return str(sum(self.__dna))
+				return str(Tools.popcount(self.__dna))
 		# printing bits separated by "-"
-		return "-".join(["%s" %pos for pos in self.__dna])
+		return "-".join(["%s" %pos for pos in self.get_DNA()])
 
 	def display(self):
 		pass
@@ -138,6 +176,174 @@ class DNA:
 		pass
 
 
+class DNA_decoder:
+	"""	class DNA_decoder: reads all genes of packed DNA strings at once.
+		It is compiled once from the gene map: each gene becomes a shift and a mask
+		that isolate its bits, and genes that need further decoding are listed by coding mode
+	"""
+
+	def __init__(self, Nb_nucleotides, Genes):
+		" Genes is a list of (start, end, coding) triples "
+		self.nb_nucleotides = Nb_nucleotides
+		self.fields = []	# one (shift, mask) per gene
+		self.unweighted = []	# loci of genes coded as the number of 1s
+		self.gray = []	# loci of Gray-coded genes
+		for (locus, (start, end, coding)) in enumerate(Genes):
+			coding = coding_mode(coding)
+			if coding == NOCODING:	self.fields.append((0, 0))	# always read as 0
+			else:	self.fields.append((Nb_nucleotides - end, (1 << (end - start)) - 1))
+			if coding == UNWEIGHTED:	self.unweighted.append(locus)
+			elif coding == GRAY:	self.gray.append(locus)
+
+	def decode(self, Row):
+		" returns the values of all genes of a packed DNA string "
+		Values = [(Row >> shift) & mask for (shift, mask) in self.fields]
+		for locus in self.unweighted:	Values[locus] = Tools.popcount(Values[locus])
+		for locus in self.gray:	Values[locus] = gray_decode(Values[locus])
+		return Values
+
+	def decode_all(self, Rows):
+		" returns the values of all genes for each packed DNA string in Rows "
+		AllValues = [[(Row >> shift) & mask for (shift, mask) in self.fields] for Row in Rows]
+		for locus in self.unweighted:
+			for Values in AllValues:	Values[locus] = Tools.popcount(Values[locus])
+		for locus in self.gray:
+			# Gray genes are decoded locus by locus over all rows
+			for (Values, Decoded) in zip(AllValues, gray_decode_all([V[locus] for V in AllValues])):
+				Values[locus] = Decoded
+		return AllValues
+
+
+class DNA_pool:
+	"""	class DNA_pool: stores one single copy of each distinct packed DNA string.
+		Individuals with identical DNA share that copy.
+		Packed strings are immutable: a mutated string is a new string, which gets interned in turn
+	"""
+
+	def __init__(self):
+		self.rows = dict()	# each string is its own key
+		self.census = dict()	# number of holders of each string at last purge
+
+	def intern(self, Row):
+		" returns the shared copy of Row "
+		return self.rows.setdefault(Row, Row)
+
+	def purge(self, Rows):
+		" forgets strings that are no longer in Rows (typically the DNA of living individuals) "
+		Census = dict()
+		for Row in Rows:	Census[Row] = Census.get(Row, 0) + 1
+		self.rows = {Row: Row for Row in map(self.intern, Census)}
+		self.census = Census
+		return len(self.rows)
+
+	def __len__(self):	return len(self.rows)
+
+	def __contains__(self, Row):	return Row in self.rows
+
+	def __str__(self):
+		return 'distinct DNA: %d\tlargest clone: %d' % (len(self.rows), max(self.census.values(), default=0))
+
+
+class DNA_matrix:
+	"""	class DNA_matrix: DNA of a set of individuals, one packed row per individual.
+		Genetic operations are performed on all rows at once,
+		typically on the whole generation of newborns of a group.
+		Rows are shared with DNA objects (packed strings are immutable)
+	"""
+
+	def __init__(self, Scenario, Nb_nucleotides, Members=()):
+		self.Scenario = Scenario
+		self.nb_nucleotides = Nb_nucleotides
+		self.rows = [M.get_row() for M in Members]
+
+	def hybrid(self, Couples, number_crossover = -1):
+		""" builds one row per couple of parents (parents are DNA objects).
+			Crossover points and starting parents are drawn for all couples at once
+		"""
+		if number_crossover < 0:	number_crossover = self.Scenario.Parameter('NbCrossover')
+		Parents = [(mother.get_row(), father.get_row()) for (mother, father) in Couples]
+		Nb = self.nb_nucleotides
+		# Each mask selects the stretches of DNA read from the second parent
+		if Nb > 1 and number_crossover:
+			Tails = _tail_masks(Nb)
+			if number_crossover == 1:
+				Masks = [Tails[random.randrange(1, Nb)] for C in Parents]
+			else:
+				Loci = range(1, Nb)
+				Masks = [reduce(xor, [Tails[c] for c in random.sample(Loci, number_crossover)])
+							for C in Parents]
+		else:	Masks = [0] * len(Parents)
+		# starting indifferently from mother or father amounts to complementing the mask
+		Swaps = random.choices((0, (1 << Nb) - 1), k=len(Parents))
+		self.rows = [parent1 ^ ((parent1 ^ parent2) & (Mask ^ Swap))
+						for ((parent1, parent2), Mask, Swap) in zip(Parents, Masks, Swaps)]
+
+	def mutate(self, mutation_rate = -1):
+		""" performs mutations on all rows - returns the total number of mutations.
+			As in DNA.mutate, the number of mutations of a row is drawn by 'chances'
+			(i.e. the expected number, rounded up or down at random),
+			and each mutation flips a random nucleotide.
+			Rows that get one more mutation are reached by geometric skips,
+			so that rows without mutation are not visited when mutations are rare.
+			Nucleotides themselves are not skip-sampled, to keep the number
+			of mutations per row identical to DNA.mutate
+		"""
+		if mutation_rate < 0:	mutation_rate = self.Scenario.Parameter('MutationRate')
+		Expected = mutation_rate / 1000.0 * self.nb_nucleotides	# per row
+		Base = int(Expected)
+		Extra = Tools.bernoulli_positions(Expected % 1, len(self.rows))	# rows with one more mutation
+		if Base == 0:
+			Mutants = [(RowNbr, 1) for RowNbr in Extra]
+		else:
+			Counts = [Base] * len(self.rows)
+			for RowNbr in Extra:	Counts[RowNbr] += 1
+			Mutants = list(enumerate(Counts))
+		Total = sum([Count for (RowNbr, Count) in Mutants])
+		# flipped nucleotides are drawn all at once
+		Flips = random.choices([1 << locus for locus in range(self.nb_nucleotides)], k=Total)
+		Start = 0
+		for (RowNbr, Count) in Mutants:
+			self.rows[RowNbr] ^= reduce(xor, Flips[Start:Start + Count])
+			Start += Count
+		return Total
+
+	def decode(self, Decoder):
+		" returns the list of gene values of each row (Decoder is a DNA_decoder) "
+		return Decoder.decode_all(self.rows)
+
+	def column_counts(self):
+		" returns the number of 1s at each position of DNA "
+		if not self.rows or self.nb_nucleotides == 0:	return [0] * self.nb_nucleotides
+		# each nucleotide is spread over as many bytes as necessary to count all rows,
+		# so that all rows can be added up at once without carries
+		Width = (len(self.rows).bit_length() + 7) // 8
+		Spread = bytearray(self.nb_nucleotides * Width)
+		Format = '0%db' % self.nb_nucleotides
+		Total = 0
+		for (Row, Nb) in Counter(self.rows).items():	# identical rows are unpacked once
+			Spread[Width - 1::Width] = format(Row, Format).encode('ascii').translate(_Nucleotides)
+			Total += Nb * int.from_bytes(Spread, 'big')
+		Counts = Total.to_bytes(self.nb_nucleotides * Width, 'big')
+		return [int.from_bytes(Counts[pos * Width:(pos + 1) * Width], 'big')
+					for pos in range(self.nb_nucleotides)]
+
+	def average(self):
+		" returns the average value of each position of DNA "
+		if not self.rows:	return [0.0] * self.nb_nucleotides
+		return [float(C) / len(self.rows) for C in self.column_counts()]
+
+	def nucleotides(self):
+		" returns the DNA of each row as a tuple of 0s and 1s (identical rows share their tuple) "
+		Tuples = dict()
+		for Row in self.rows:
+			if Row not in Tuples:	Tuples[Row] = _unpack(Row, self.nb_nucleotides)
+		return [Tuples[Row] for Row in self.rows]
+
+	def __len__(self):	return len(self.rows)
+
+	def __iter__(self):	return iter(self.rows)
+
+
 if __name__ == "__main__":
 	print(__doc__)
 	print(DNA.__doc__ + '\n')
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+##############################################################################
+# EVOLIFE  http://evolife.telecom-paris.fr             Jean-Louis Dessalles  #
+# Telecom Paris  2021                                      www.dessalles.fr  #
+# -------------------------------------------------------------------------- #
+# License:  Creative Commons BY-NC-SA                                        #
+##############################################################################
+
+
+##############################################################################
+#  Diversity                                                                 #
+##############################################################################
+
+""" EVOLIFE: Module Diversity:
+		Measures of genetic diversity within a set of individuals.
+		Distances are Hamming distances computed by popcount on packed DNA (see DNA_matrix).
+		Identical DNA strings are processed only once.
+"""
+
+import sys
+if __name__ == '__main__':  sys.path.append('../..')  # for tests
+
+import random
+from collections import Counter
+
+from Evolife.Tools.Tools import popcount
+
+# Measures that can be displayed as curves (see Observer), with their legends
+Measures = {'MeanDistance':	'Average Hamming distance between members of a group',
+			'Diversity':		'Nucleotide diversity within groups (average % of differing nucleotides)',
+			'NearestNeighbour':	'Average Hamming distance to the closest other member of the group',
+			'Clusters':			'Average number of clusters of similar genomes in groups'}
+
+
+class Diversity:
+	""" class Diversity: genetic diversity of a set of DNA strings (a DNA_matrix).
+		Average distance and nucleotide diversity are exact.
+		Pairwise measures (distance matrix, nearest neighbours, clusters)
+		are computed on a sample of at most SampleSize strings.
+	"""
+
+	def __init__(self, Matrix, SampleSize=300, Threshold=1):
+		self.nb_nucleotides = Matrix.nb_nucleotides
+		self.size = len(Matrix)
+		self.column_counts = Matrix.column_counts()
+		self.Threshold = Threshold	# maximal distance between neighbours in a cluster
+		if self.size > SampleSize:	self.sample = random.sample(Matrix.rows, SampleSize)
+		else:	self.sample = list(Matrix.rows)
+		self.genotypes = Counter(self.sample)	# distinct strings with their multiplicity
+
+	def mean_distance(self):
+		" average Hamming distance between two members "
+		# at each locus, c ones and n-c zeros make c*(n-c) differing pairs
+		if self.size < 2:	return 0
+		Pairs = self.size * (self.size - 1) / 2.0
+		return sum([C * (self.size - C) for C in self.column_counts]) / Pairs
+
+	def nucleotide_diversity(self):
+		" probability that two members differ at a given locus "
+		if self.nb_nucleotides == 0:	return 0
+		return self.mean_distance() / self.nb_nucleotides
+
+	def hamming_matrix(self):
+		" pairwise Hamming distances between sampled DNA strings "
+		Distances = dict()	# computed once for each pair of distinct strings
+		Matrix = []
+		for Row1 in self.sample:
+			Line = []
+			for Row2 in self.sample:
+				Pair = (Row1, Row2) if Row1 <= Row2 else (Row2, Row1)
+				if Pair not in Distances:	Distances[Pair] = popcount(Row1 ^ Row2)
+				Line.append(Distances[Pair])
+			Matrix.append(Line)
+		return Matrix
+
+	def nearest_neighbours(self):
+		" distance of each sampled DNA string to the closest other one "
+		Nearest = dict()
+		Genotypes = list(self.genotypes)
+		for G in Genotypes:
+			if self.genotypes[G] > 1:	Nearest[G] = 0	# identical twin in the sample
+			else:	Nearest[G] = min([popcount(G ^ H) for H in Genotypes if H != G], default=0)
+		return [Nearest[Row] for Row in self.sample]
+
+	def clusters(self):
+		""" sizes of clusters of sampled DNA strings, largest first.
+			Two strings belong to the same cluster when they are linked
+			by a chain of strings that differ by at most Threshold nucleotides
+		"""
+		Genotypes = list(self.genotypes)
+		Root = list(range(len(Genotypes)))	# union-find forest
+		def find(G):
+			while Root[G] != G:
+				Root[G] = Root[Root[G]]
+				G = Root[G]
+			return G
+		for (G1, Row1) in enumerate(Genotypes):
+			for G2 in range(G1 + 1, len(Genotypes)):
+				if popcount(Row1 ^ Genotypes[G2]) <= self.Threshold:
+					Root[find(G1)] = find(G2)
+		Sizes = Counter()
+		for (G, Row) in enumerate(Genotypes):	Sizes[find(G)] += self.genotypes[Row]
+		return sorted(Sizes.values(), reverse=True)
+
+	def summary(self):
+		" returns all measures as a dictionary (see Measures) "
+		Nearest = self.nearest_neighbours()
+		return {'MeanDistance':	self.mean_distance(),
+				'Diversity':		100 * self.nucleotide_diversity(),
+				'NearestNeighbour':	sum(Nearest) / float(len(Nearest)) if Nearest else 0,
+				'Clusters':			len(self.clusters())}
+
+	def __str__(self):
+		return ' '.join(['%s: %.2f' % (M, V) for (M, V) in self.summary().items()])
+
+
+###############################
+# Local Test                  #
+###############################
+
+if __name__ == "__main__":
+	print(__doc__)
+	print(Diversity.__doc__ + '\n')
+
+
+__author__ = 'Dessalles'
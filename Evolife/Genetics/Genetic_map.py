@@ -20,6 +20,7 @@ if __name__ == '__main__':  sys.path.append('../..')  # for tests
 
 
 from Evolife.Tools.Tools import error
+from Evolife.Genetics.DNA import DNA_decoder, coding_mode, NOCODING, UNWEIGHTED
 
 class Gene_def:
 	"""	class Gene_def: definition of semantic segments on DNA.
@@ -74,6 +75,24 @@ class Genetic_map:
 			self.GeneMap.append(NewGene)
 			locus += 1
 			current_pos = NewGene.end
+		self.__length = current_pos
+		# indexing genes by name and by locus, once and for all
+		self.__loci = {g.name: g.locus for g in self.GeneMap}
+		self.__locus_table = tuple((g.start, g.end, coding_mode(g.coding), self.__coding_range(g))
+									for g in self.GeneMap)	# locus --> (start, end, coding, range)
+		# compiling a decoder that reads all genes at once
+		self.Decoder = DNA_decoder(current_pos, [G[:3] for G in self.__locus_table])
+
+	def __coding_range(self, Gene):
+		" computes the maximal amplitude of a gene "
+		coding = coding_mode(Gene.coding)
+		if coding == UNWEIGHTED:
+			# Genes are coded as the number of 1s on the DNA section
+			return Gene.length
+		elif coding == NOCODING:
+			return 1
+		# Usual integer coding (Weighted or Gray)
+		return (1 << Gene.length) - 1
 
 	def get_gene(self,locus):
 		try:
@@ -82,10 +101,8 @@ class Genetic_map:
 			error("Gene_def: incorrect locus")
 
 	def get_locus(self, gene_name):
-		for g in self.GeneMap:
-			if g.name == gene_name:
-				return g.locus
-		error("Genetic_map: unknown gene name: " + str(gene_name))
+		try:	return self.__loci[gene_name]
+		except KeyError:	error("Genetic_map: unknown gene name: " + str(gene_name))
 		return None
 
 	def get_gene_name(self, locus):
@@ -95,34 +112,32 @@ class Genetic_map:
 		return [g.name for g in self.GeneMap]
 	
 	def get_gene_boundaries(self,locus):
-		return (self.get_gene(locus).start, self.get_gene(locus).end)
+		return self.__locus_table[locus][:2]
 
 	def get_coding(self, locus):
 		return self.get_gene(locus).coding
 		
 	def gene_boundaries(self, gene_name):
-		return get_boundaries(self, get_locus(self, gene_name))
+		return self.get_gene_boundaries(self.get_locus(gene_name))
 
 	def geneMap_length(self):
-		return self.get_gene(len(self.GeneMap)-1).end
+		return self.__length
 
 	def locus_range(self, Locus):
 		" returns the maximal amplitude of the gene at Locus "
-		coding = self.get_gene(Locus).coding.lower()
-		if coding in ['weighted', 'gray']:
-			# Usual integer coding
-			return (1 << self.get_gene(Locus).length ) - 1
-		elif coding == 'unweighted':
-			# Genes are coded as the number of 1s on the DNA section
-			return self.get_gene(Locus).length
-		elif coding == 'nocoding':
-			return 1
-		else:
-			error("Genetic Map", 'unknown binary coding mode: %s' % str(coding))
+		return self.__locus_table[Locus][3]
 
 	def gene_range(self, gene_name):
 		return self.locus_range(self.get_locus(gene_name))
 
+	def gene_accessor(self, gene_name, relative=False):
+		""" returns a function that reads the value (or relative value) of gene_name
+			in an individual - saves name lookups in time-critical scenario functions
+		"""
+		Locus = self.get_locus(gene_name)
+		if relative:	return lambda indiv: indiv.locus_relative_value(Locus)
+		return lambda indiv: indiv.locus_value(Locus)
+
 	def gene_pattern(self):
 		" generates a tuple giving a binary mask showing gene alternation on DNA "
 		G = 0
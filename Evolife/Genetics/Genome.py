@@ -25,6 +25,8 @@ from Evolife.Genetics.DNA import DNA
 class Gene:
 	"   class Gene: actual gene (semantic segment on DNA) with intensity "
 
+	__slots__ = ('locus', 'intensity')
+
 	def __init__(self, gene_locus, intensity = 0):
 		self.locus = gene_locus
 		self.intensity = intensity
@@ -36,19 +38,18 @@ class Gene:
 class Genome(DNA):
 	"   class Genome: set of genes carried by individuals "
 
-	def __init__(self, Scenario):
+	def __init__(self, Scenario, Row=None):
 		self.Scenario = Scenario
 		self.genome = []
 		for g in self.Scenario.GeneMap:
 			self.genome.append(Gene(g.locus))
-		DNA.__init__(self, self.Scenario, self.Scenario.geneMap_length())
+		DNA.__init__(self, self.Scenario, self.Scenario.geneMap_length(), Row=Row)
 
-	def update(self):
+	def update(self, GeneValues=None):
 		# gene values are read from DNA
-		for locus in range(0,len(self.Scenario.GeneMap)):
-			(b1,b2) = self.Scenario.get_gene_boundaries(locus)
-			coding = self.Scenario.get_coding(locus)
-			self.genome[locus].intensity = self.read_DNA(b1, b2, coding=coding)
+		# (GeneValues may be provided when already decoded, see DNA_matrix)
+		if GeneValues is None:	GeneValues = self.Scenario.Decoder.decode(self.get_row())
+		for (G, Value) in zip(self.genome, GeneValues):	G.intensity = Value
 
 	def gene_value(self, name):
 		# absolute intensity addressed trough name
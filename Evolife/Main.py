@@ -100,7 +100,12 @@ Obs.TextDisplay('\nScenario ' + ScenarioName + ' initialized\n')
 try:
 	import Evolife.Ecology.Population
 
-	Pop = Evolife.Ecology.Population.EvolifePopulation(MyScenario, Obs)
+	if MyScenario.Parameter('GenotypeCounts', Default=0):
+		# individuals are not simulated one by one, but counted by genotype
+		import Evolife.Ecology.Aggregate
+		Pop = Evolife.Ecology.Aggregate.GenotypePopulation(MyScenario, Obs)
+	else:
+		Pop = Evolife.Ecology.Population.EvolifePopulation(MyScenario, Obs)
 	Obs.TextDisplay('%s\n' % Pop)
 except:
 	# the error stack is displayed
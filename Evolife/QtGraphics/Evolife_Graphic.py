@@ -43,6 +43,7 @@ sys.path.append('..')
 from Evolife.QtGraphics.Plot_Area import Image_Area, Draw_Area, Ground
 # from Evolife.QtGraphics.Curves import EvolifeColourID, EvolifeColourNames
 from Evolife.Tools.Tools import Nb2A0, warning
+from Evolife.Ecology.Network import NetworkSnapshot, snapshot_from_links
 
 
 ##################################################
@@ -321,7 +322,7 @@ class Network_window(Satellite_window):
 		# self.Area.Board.fill(QtGui.QColor(QtCore.Qt.white))
 		self.Area.set_margins(20,20,20,20)
 		self.axes()
-		self.friends = {}
+		self.friends = NetworkSnapshot([], [0], [])
 
 
 	def axes(self):
@@ -344,17 +345,17 @@ class Network_window(Satellite_window):
 		if not network:	return ''
 		positions = dict([L for L in Layout if len(L) == 2 and type(L[1]) == tuple]) # positions of individuals
 		if positions == {}:	return None
-		self.friends = dict(network)
+		# network is a snapshot (see Network) or a list of (ID, [friend IDs]) pairs
+		if not isinstance(network, NetworkSnapshot):	network = snapshot_from_links(network)
+		self.friends = network
 		self.Area.scaleX = max(self.Area.scaleX, max([positions[individual][0] for individual in positions]))
 		self.Area.erase()
 		self.axes()
-		for individual in self.friends:
-			if len(self.friends[individual]):
-				bestFriend = self.friends[individual][0]
+		for (individual, bestFriend) in network.best_friends():
+			try:
 				self.Area.move(6, (positions[individual][0],0))
-				try:
-					self.Area.plot(6, (positions[bestFriend][0],self.Area.scaleY), 2)
-				except KeyError:	warning('friend has vanished', bestFriend)
+				self.Area.plot(6, (positions[bestFriend][0],self.Area.scaleY), 2)
+			except KeyError:	warning('friend has vanished', bestFriend)
 ##				if len(self.friends[friend]) and individual == self.friends[friend][0]:
 ##					self.plot(6, (positions[friend][0],self.scaleY), 3)
 ##				else:
@@ -367,9 +368,9 @@ class Network_window(Satellite_window):
 		PhotoName = self.photo(Prefix, CurrentFrame, outputDir=self.OutputDir)
 		MatrixFileName = os.path.join(self.OutputDir, Prefix + Nb2A0(self.FrameNumber) + '.txt')
 		MatrixFile = open(MatrixFileName,'w')
-		for Individual in friends:
+		for (Individual, Friends) in friends.links():
 			MatrixFile.write(str(Individual))
-			for F in friends[Individual]:
+			for F in Friends:
 				MatrixFile.write('\t%s' % F)
 			MatrixFile.write('\n')
 		MatrixFile.close()
@@ -30,12 +30,17 @@
 			- prepare(self, indiv): individual initialization before starting interactions
 		- interaction(self, Indiv, Partner):	defines a single interaction 
 			- partner(self, Indiv, members):	select a partner among 'members' that will interact with 'Indiv'
+		  (or, if PayoffGame is set, interactions are computed from the following two functions)
+			- game_class(self, Indiv):	class of 'Indiv' in the game (e.g. its genotype)
+			- payoff(self, Class1, Class2):	gains of both players, given their classes
 		- end_game(self, members):  an occasion for a closing round after all interactions
 		- evaluation(self, Indiv):  defines how the score of an individual is computed
+			(scores are memorized by DNA if the scenario sets PureEvaluation to True)
 		- lives(self, members): converts scores into life points
 	+ couples(self, members): returns a list of couples for procreation (individuals may appear in several couples!)- Calls the following functions:
 		- parenthood(self, RankedCandidates, Def_Nb_Children):	Determines the number of children depending on rank
 		- parents(self, candidates):	selects two parents from a list of candidates (candidate = (indiv, NbOfPotentialChildren))
+			- compatible(self, indiv1, indiv2):	says whether two individuals may mate (restrictions applied in 'parents')
 	+ new_agent(self, child, parents): initializes newborns
 	+ remove_agent(self, agent): action to be performed when an agent dies
 	+ update_positions(self, members, groupID):	assigns a position to agents
@@ -56,10 +61,21 @@ import random
 
 from Evolife.Scenarii.Parameters import Parameters
 from Evolife.Genetics.Genetic_map import Genetic_map
-from Evolife.Tools.Tools import decrease, chances
+from Evolife.Genetics.DNA import DNA_pool
+from Evolife.Tools.Tools import decrease_vector, chances, chances_all, LRUCache, Candidates
+from Evolife.Tools.Tools import random_other, random_pairing
 
 class Default_Scenario(Parameters, Genetic_map):
 
+	# Scenarii in which 'evaluation' computes the score from DNA only
+	# may set this flag to True: scores are then memorized by DNA
+	PureEvaluation = False
+
+	# Scenarii in which the outcome of an interaction depends only on
+	# the classes of both players (see game_class and payoff)
+	# may set this flag to True: interactions are then computed by class
+	PayoffGame = False
+
 	######################################
 	# All functions below can be		 #
 	# overloaded in specific scenarii	 #
@@ -81,6 +97,12 @@ class Default_Scenario(Parameters, Genetic_map):
 		
 		# creating the genetic map
 		Genetic_map.__init__(self, self.genemap())
+		# memory of scores already computed for identical DNA
+		self.FitnessCache = None
+		if self.PureEvaluation and self.Parameter('FitnessCache', Default=10000) > 0:
+			self.FitnessCache = LRUCache(self.Parameter('FitnessCache', Default=10000))
+		# single copy of identical DNA strings
+		self.GenePool = DNA_pool() if self.Parameter('GenomeInterning', Default=0) else None
 		self.initialization()
 
 	def initialization(self):
@@ -132,21 +154,62 @@ class Default_Scenario(Parameters, Genetic_map):
 		# Note: scores should always be kept positive
 		pass
 
+	def evaluate(self, indiv):
+		""" calls 'evaluation', unless the score has already been
+			computed for an identical DNA (see PureEvaluation)
+		"""
+		if self.FitnessCache is None:
+			self.evaluation(indiv)
+			return
+		Row = indiv.get_row()	# packed DNA is its own content address
+		Score = self.FitnessCache.get(Row)
+		if Score is None:
+			self.evaluation(indiv)
+			self.FitnessCache.store(Row, indiv.score())
+		elif indiv.score() != Score:	indiv.score(Score, FlagSet=True)	# unchanged scores keep rankings valid
+
 	def partner(self, indiv, members):
 		""" Decides whom to interact with - Used in 'life_game'
 		"""
 		# By default, a partner is randomly chosen
-		partners = members[:]
-		partners.remove(indiv)
-		if partners != []:
-			return random.choice(partners)
-		else:
-			return None
+		return random_other(members, (indiv,))
 					
 	def interaction(self, indiv, partner):
 		" Nothing by default - Used in 'life_game' "
 		pass
 
+	def game_class(self, indiv):
+		""" returns the class of indiv in a game defined by payoffs (see PayoffGame).
+			Classes may be any hashable value (e.g. a tuple of gene values)
+		"""
+		return 0
+
+	def payoff(self, Class1, Class2):
+		""" returns the pair of gains of indiv and partner (see 'interaction')
+			when they belong to classes Class1 and Class2 - Used if PayoffGame
+		"""
+		return (0, 0)
+
+	def payoff_game(self, members):
+		""" plays all rounds of interactions with random partners in one go.
+			Each pair of classes is evaluated once and gains are added up
+			before being credited to scores
+		"""
+		Classes = [self.game_class(indiv) for indiv in members]
+		Payoffs = dict()	# gains memorized by pair of classes
+		Gains = [0] * len(members)
+		Players = range(len(members))
+		for play in range(self.Parameter('Rounds', Default=1)):
+			for (Player, Partner) in random_pairing(Players):
+				if Partner is None:	continue
+				Pair = (Classes[Player], Classes[Partner])
+				try:	(Gain1, Gain2) = Payoffs[Pair]
+				except KeyError:	(Gain1, Gain2) = Payoffs[Pair] = self.payoff(*Pair)
+				Gains[Player] += Gain1
+				Gains[Partner] += Gain2
+		for (indiv, Gain) in zip(members, Gains):
+			if Gain:	indiv.score(Gain)
+
 	def end_game(self, members):
 		""" defines what to do  at the group level once all interactions
 			have occurred - Used in 'life_game'
@@ -160,35 +223,49 @@ class Default_Scenario(Parameters, Genetic_map):
 		# First: make initializations
 		self.start_game(members)
 		# Then: play multipartite games
-		for play in range(self.Parameter('Rounds', Default=1)):
-			players = members[:]	# ground copy
-			random.shuffle(players)
-			# Individuals engage in several interactions successively
-			for indiv in players:
-				Partner = self.partner(indiv, players)
-				if Partner is not None:
-					self.interaction(indiv, Partner)
+		if self.PayoffGame and type(self).partner is Default_Scenario.partner:
+			# interactions are computed from payoffs
+			self.payoff_game(members)
+		else:	self.interactions(members)
 		# Lastly: work out
 		self.end_game(members)
 		# Alternatively (or successively): play individual games
 		for indiv in members:
-			self.evaluation(indiv)
+			self.evaluate(indiv)
 		# scores are translated into life points
 		self.lives(members)
 
+	def interactions(self, members):
+		" all rounds of interactions, played one by one "
+		for play in range(self.Parameter('Rounds', Default=1)):
+			players = members[:]	# ground copy
+			random.shuffle(players)
+			if type(self).partner is Default_Scenario.partner:
+				# partners are chosen at random: all are drawn at once
+				Pairs = random_pairing(players)
+			else:
+				# partner choice may depend on previous interactions
+				Pairs = ((indiv, self.partner(indiv, players)) for indiv in players)
+			# Individuals engage in several interactions successively
+			for (indiv, Partner) in Pairs:
+				if Partner is not None:
+					self.interaction(indiv, Partner)
+
 	def lives(self, members):
 		" converts scores into life points "
 		if self.Parameter('SelectionPressure') == 0:
 			return
 		if len(members) == 0:
 			return
-		BestScore = max([i.score() for i in members])
-		MinScore = min([i.score() for i in members])
+		Scores = [i.score() for i in members]	# scores are read once
+		BestScore = max(Scores)
+		MinScore = min(Scores)
 		if BestScore == MinScore:	return
-		for indiv in members:
-			# translating scores to zero and above
-			indiv.LifePoints = (self.Parameter('SelectionPressure') \
-								* (indiv.score() - MinScore))/float(BestScore - MinScore)
+		# translating scores to zero and above
+		Pressure = self.Parameter('SelectionPressure')
+		Range = float(BestScore - MinScore)
+		for (indiv, Score) in zip(members, Scores):
+			indiv.LifePoints = (Pressure * (Score - MinScore)) / Range
 		return
 
 		
@@ -199,25 +276,32 @@ class Default_Scenario(Parameters, Genetic_map):
 
 	def parenthood(self, RankedCandidates, Def_Nb_Children):
 		" Determines the number of children depending on rank "
-		candidates = [[m,0] for m in RankedCandidates]
 		# parenthood is distributed as a function of the rank
 		# it is the responsibility of the caller to rank members appropriately
 		# Note: reproduction_rate has to be doubled, as it takes two parents to beget a child
-		for ParentID in enumerate(RankedCandidates):
-			candidates[ParentID[0]][1] = chances(decrease(ParentID[0],len(RankedCandidates),
-											   self.Parameter('Selectivity')), 2 * Def_Nb_Children)
+		Probas = decrease_vector(len(RankedCandidates), self.Parameter('Selectivity'))
+		candidates = [[m, NbChildren] for (m, NbChildren)
+						in zip(RankedCandidates, chances_all(Probas, 2 * Def_Nb_Children))]
 		# print(self.Parameter('Selectivity'))
-		# print([chances(decrease(ii,len(RankedCandidates), self.Parameter('Selectivity')), 2 * Def_Nb_Children) for ii in range(20)])
 		return candidates
 	
 	def parents(self, candidates):
 		"""	Selects one couple from candidates.
 			Candidates are (indiv, NbChildren) pairs, where NbChildren indicates the number of
-			children that indiv can still have
+			children that indiv can still have.
+			candidates behaves as a list of the pairs with positive NbChildren
+			(random.choice and random.sample on it take logarithmic time - see Tools.Candidates)
 		"""
 		try:
 			return random.sample(candidates, 2)
 		except ValueError:	return None
+
+	def compatible(self, indiv1, indiv2):
+		""" says whether indiv1 and indiv2 may form a couple.
+			Scenarii that restrict mating in 'parents' should say so here
+			(used when populations are represented by genotype counts, see Aggregate)
+		"""
+		return True
 		
 	def couples(self, members, nb_children=-1):
 		""" Returns a set of couples that will beget newborns
@@ -235,13 +319,14 @@ class Default_Scenario(Parameters, Genetic_map):
 
 		Couples = []
 		# print candidates[:10]
+		Eligible = Candidates(candidates)	# candidates that can still have children
 		for ii in range(nb_children):
-			Couple = self.parents([p for p in candidates if p[1] > 0])	# selects two parents from the list of candidates
+			Couple = self.parents(Eligible)	# selects two parents from the list of candidates
 			if Couple:
 				(mother, father) = Couple
 				Couples.append((mother[0],father[0]))
-				mother[1] -= 1
-				father[1] -= 1
+				Eligible.consume(mother)
+				Eligible.consume(father)
 			else:	break
 		return Couples
 
@@ -27,7 +27,7 @@ if __name__ == '__main__':  sys.path.append('../..')  # for tests
 
 import random
 
-from Evolife.Tools.Tools import percent, noise_mult, error
+from Evolife.Tools.Tools import percent, noise_mult, error, random_other
 from Evolife.Scenarii.Default_Scenario import Default_Scenario
 
 ######################################
@@ -74,14 +74,7 @@ class Scenario(Default_Scenario):
 		if BF and random.randint(0,100) >= indiv.gene_relative_value('Exploration'):
 			return BF
 		# Exploration: a new partner is randomly chosen
-		partners = others[:]	# ground copy of the list
-		partners.remove(indiv)
-		if BF in others:
-			partners.remove(BF)
-		if partners != []:
-			return random.choice(partners)
-		else:
-			return None
+		return random_other(others, (indiv, BF))
 
 	def interaction(self, indiv, Partner):
 		""" Dyadic cooperative interaction: one player (indiv) makes the first step by
@@ -39,6 +39,8 @@ from Evolife.Scenarii.Default_Scenario import Default_Scenario
 
 class Scenario(Default_Scenario):
 
+	PayoffGame = True	# interactions only depend on both players' genes (see payoff)
+
 	######################################
 	# Most functions below overload some #
 	# functions of Default_Scenario	  #
@@ -63,28 +65,27 @@ class Scenario(Default_Scenario):
 		Default_Scenario.start_game(self, members)
 
 	def interaction(self, indiv, Partner):
+		(Gain, PartnerGain) = self.payoff(self.game_class(indiv), self.game_class(Partner))
+		if Gain:	indiv.score(Gain)
+		if PartnerGain:	Partner.score(PartnerGain)
+
+	def game_class(self, indiv):
+		" individuals are characterized by their signal and by the signals they push for "
+		return (indiv.gene_value('signal'), indiv.gene_value('push_mask'))
 
-		def signal(indiv):
-			return indiv.gene_value('signal')
+	def payoff(self, Class1, Class2):
 
-		def pushes(indiv,signal):
+		def pushes(Class,signal):
 			""" defines indiv's actual hunting behaviour depending on the signal emitted
 				by the opponent
 			"""
-			return indiv.gene_value('push_mask') & (1 << signal)
+			return Class[1] & (1 << signal)
 		
 		# individuals engage in the push-pull coordination game
 		# implementing the payoff matrix
-		if pushes(indiv,signal(Partner)):
-			if not pushes(Partner, signal(indiv)):
-				indiv.score(1)
-				Partner.score(1)
-		else:
-			if pushes(Partner, signal(indiv)):
-				indiv.score(1)
-				Partner.score(1)
-
-			
+		if bool(pushes(Class1, Class2[0])) != bool(pushes(Class2, Class1[0])):
+			return (1, 1)
+		return (0, 0)
 
 	def display_(self):
 		""" Defines what is to be displayed. It offers the possibility
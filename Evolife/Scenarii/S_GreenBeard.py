@@ -46,6 +46,8 @@ from Evolife.Tools.Tools import percent
 
 class Scenario(Default_Scenario):
 
+	PayoffGame = True	# interactions only depend on both players' genes (see payoff)
+
 	######################################
 	# Most functions below overload some #
 	# functions of Default_Scenario	  #
@@ -60,6 +62,12 @@ class Scenario(Default_Scenario):
 		"""
 		return [('GreenBeard',1),('Nasty',1)]
 
+	def initialization(self):
+		Default_Scenario.initialization(self)
+		# gene readers bound once and for all to their locus
+		self.GreenBeard = self.gene_accessor('GreenBeard')
+		self.Nasty = self.gene_accessor('Nasty')
+
 	def start_game(self,members):
 		""" defines what to be done at the group level before interactions
 			occur - Used in 'life_game'
@@ -74,18 +82,30 @@ class Scenario(Default_Scenario):
 	def interaction(self, indiv, partner):
 		""" Genes control the behaviour of 'indiv' toward 'partner'
 		"""
-		if (not indiv.gene_value('GreenBeard')) and indiv.gene_value('Nasty') and partner.gene_value('GreenBeard'):
-			indiv.score(self.Parameter('N_Payback'))
-			partner.score(-self.Parameter('N_Attack'))
-		elif indiv.gene_value('GreenBeard') and (not indiv.gene_value('Nasty')) and partner.gene_value('GreenBeard'):
-			indiv.score(-self.Parameter('GB_Cost'))
-			partner.score(self.Parameter('GB_Gift'))
-		elif indiv.gene_value('GreenBeard') and indiv.gene_value('Nasty') and partner.gene_value('GreenBeard'):
-			indiv.score(self.Parameter('N_Payback'))
-			indiv.score(-self.Parameter('GB_N_Penalty'))
-			partner.score(-self.Parameter('N_Attack'))
-		if indiv.gene_value('Nasty'):
-			indiv.score(-self.Parameter('N_Penalty'))
+		(Gain, PartnerGain) = self.payoff(self.game_class(indiv), self.game_class(partner))
+		if Gain:	indiv.score(Gain)
+		if PartnerGain:	partner.score(PartnerGain)
+
+	def game_class(self, indiv):
+		" individuals are characterized by their two genes "
+		return (self.GreenBeard(indiv), self.Nasty(indiv))
+
+	def payoff(self, Class1, Class2):
+		" gains of indiv and partner depending on their genes "
+		(GreenBeard, Nasty) = Class1
+		(PartnerGreenBeard, PartnerNasty) = Class2
+		Gain = PartnerGain = 0
+		if PartnerGreenBeard:
+			if Nasty:
+				Gain += self.Parameter('N_Payback')
+				if GreenBeard:	Gain -= self.Parameter('GB_N_Penalty')
+				PartnerGain -= self.Parameter('N_Attack')
+			elif GreenBeard:
+				Gain -= self.Parameter('GB_Cost')
+				PartnerGain += self.Parameter('GB_Gift')
+		if Nasty:
+			Gain -= self.Parameter('N_Penalty')
+		return (Gain, PartnerGain)
 
 	def parents(self, candidates):
 		"""
@@ -97,13 +117,17 @@ class Scenario(Default_Scenario):
 			for i in range(10):
 				m = random.choice(candidates)
 				f = random.choice(candidates)
-				if m[0].gene_value('Nasty') and f[0].gene_value('GreenBeard'):
-					continue
-				if f[0].gene_value('Nasty') and m[0].gene_value('GreenBeard'):
-					continue
-				return (m,f)
+				if self.compatible(m[0], f[0]):
+					return (m,f)
 			return None
 		except	IndexError:	return None
+
+	def compatible(self, indiv1, indiv2):
+		" with N_Segregation, GreenBeard carriers and nasty carriers do not mate "
+		if not self.Parameter('N_Segregation'):	return True
+		if self.Nasty(indiv1) and self.GreenBeard(indiv2):	return False
+		if self.Nasty(indiv2) and self.GreenBeard(indiv1):	return False
+		return True
 		
 	def display_(self):
 		""" Defines the name of genes and their position on the DNA.
@@ -113,7 +137,7 @@ class Scenario(Default_Scenario):
 		[('genename1', 8, 'Weighted'), ('genename2', 4, 'Unweighted'),...]:	coding can be 'Weighted', 'Unweighted', 'Gray', 'NoCoding'.
 		Note that 'Unweighted' is unsuitable to explore large space.
 		"""
-		return [('green1','GreenBeard'),('red','Nasty')]
+		return [('green1','GreenBeard'),('red','Nasty'),('blue','Diversity')]
 
 
 
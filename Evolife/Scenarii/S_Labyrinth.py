@@ -158,6 +158,7 @@ class Scenario(Default_Scenario):
 	def evaluation(self, indiv):
 		""" Implements the computation of individuals' scores
 		"""
+		# PureEvaluation is not set: paths depend on poison laid by others and on random moves
 		if indiv.score() == 0:
 			# the individual has not yet been evaluated
 			B = self.get_path(indiv.get_DNA())
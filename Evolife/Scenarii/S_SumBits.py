@@ -35,6 +35,8 @@ from Evolife.Scenarii.Default_Scenario import Default_Scenario
 
 class Scenario(Default_Scenario):
 
+	PureEvaluation = True	# scores depend on DNA only
+
 	######################################
 	# Most functions below overload some #
 	# functions of Default_Scenario	  #
@@ -41,6 +41,8 @@ class Scenario(Default_Scenario):
 		a string that can be better compressed.
 	"""
 
+	PureEvaluation = True	# scores depend on DNA only
+
 	######################################
 	# Most functions below overload some #
 	# functions of Default_Scenario	  #
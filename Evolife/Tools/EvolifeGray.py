@@ -14,57 +14,57 @@
 #  http://en.wikipedia.org/wiki/Gray_code                                    #
 ##############################################################################
 
-""" This module implements a Gray code, using a function
-	borrowed from http://www.finalcog.com/python-grey-code-algorithm
+""" This module implements a Gray code.
+	Decoding needs no table: the decoded value is the XOR of all right shifts
+	of the Gray-coded value, which is computed with log2(length) XOR-shifts.
 	usage:
 	G = GrayCode()
-	G.Gray2Int(17) = 25
+	G.Gray2Int(25) = 17
+	G.Int2Gray(17) = 25
+	gray_decode_all([25, 3]) = [17, 2]
 	If you want to visualize the table:
 	G = GrayCode(5)
 	print G
 """
-  
-import math
+
+
+def gray_encode(Value):
+	" returns the Gray code of Value "
+	return Value ^ (Value >> 1)
+
+def gray_decode(GrayValue):
+	" returns the integer coded by GrayValue (whatever its length) "
+	# prefix XOR: bit i of the result is the XOR of bits i and above of GrayValue
+	Shift = 1
+	while GrayValue >> Shift:
+		GrayValue ^= GrayValue >> Shift
+		Shift <<= 1
+	return GrayValue
+
+def gray_decode_all(GrayValues):
+	" decodes a whole list of Gray-coded values "
+	Values = list(GrayValues)
+	Largest = max(Values, default=0)
+	Shift = 1
+	while Largest >> Shift:
+		Values = [V ^ (V >> Shift) for V in Values]
+		Shift <<= 1
+	return Values
+
 
 class GrayCode(object):
+	" Gray code of a given length (the length is only used for display) "
 
 	def __init__(self, Length=8):	
-		self.GrayTable = dict()
-		self.InitGrayTable(Length)
-
-	def InitGrayTable(self, Length):
-		# print "Initializing a %d-bit long Gray Table" % Length
 		self.Length = Length
-		for ii in range(2 << (Length-1)):
-			self.GrayTable[ii] = self.Int2Gray(ii)
- 
-	def Int2Gray(self,i):
-		"""
-		This function returns the i'th Gray Code.
-		It is recursive and operates in O(log n) time.
-		This function is borrowed from http://www.finalcog.com/python-grey-code-algorithm
-		"""
-		if i == 0: return 0
-		if i == 1: return 1
-		ln2 = int(math.log(i,2))
-		# the grey code of index i is the same as the gray code of an index an 
-		# equal distance on the other side of ln2-0.5, but with bit ln2 set
-		pivot = 2**(ln2) - 0.5 # TODO: double everything so that we use no floats
-		delta = i - pivot
-		mirror = int(pivot - delta)
-		x = self.Int2Gray(mirror)	# get the grey code of the 'mirror' value
-		x = x + 2**(ln2)	# set the high bit
-		return x
+
+	def Int2Gray(self, i):
+		" returns the i'th Gray Code "
+		return gray_encode(i)
 
 	def Gray2Int(self, GrayIndex):
 		" converts a coded integer into a decoded integer by using a Gray code "
-		try:
-			return self.GrayTable[GrayIndex]
-		except KeyError:
-			self.InitGrayTable(int(math.log(GrayIndex,2))+1)
-			return self.GrayTable[GrayIndex]
-			
-			
+		return gray_decode(GrayIndex)
 
 	def PaddedGray(self, i):
 		" return a padded binary string for i "
@@ -72,7 +72,7 @@ class GrayCode(object):
 		return S[-self.Length:]
    
 	def __str__(self):
-		return '\n'.join([self.PaddedGray(self.GrayTable[ii]) for ii in self.GrayTable])
+		return '\n'.join([self.PaddedGray(self.Int2Gray(ii)) for ii in range(1 << self.Length)])
 
 
 __author__ = 'Dessalles'
@@ -17,11 +17,16 @@ import sys
 import re
 import random
 import time
-from math import floor, modf, log
+from math import floor, modf, log, sqrt
+from bisect import bisect_right
+from itertools import accumulate
+from collections import OrderedDict
+from collections.abc import Sequence
+from functools import lru_cache
 
 try:
-	import EvolifeGray # gray code
-	GrayTable = EvolifeGray.GrayCode() # pre-computes a Gray code into a table for rapid acess
+	import Evolife.Tools.EvolifeGray as EvolifeGray	# gray code
+	GrayTable = EvolifeGray.GrayCode() # kept for compatibility - Gray decoding needs no table
 except ImportError:
 	pass
 
@@ -50,6 +55,30 @@ def decrease(x, M, Selection):
 	return D
 	
 
+@lru_cache(maxsize=32)
+def decrease_vector(M, Selection):
+	""" Computes decrease(x, M, Selection) for all ranks x in [0,M[ at once
+		Vectors are memorized for the last (M, Selection) pairs used
+	"""
+	if M == 0:	return ()
+	if not Selection:	return (1.0/M,) * M
+	Norm = log(1+Selection)
+	Values = [1.0/(x+(1.0*M)/Selection) / Norm for x in range(M+1)]	# same as one_value in decrease
+	return tuple([(Values[x] + Values[x+1])/2 for x in range(M)])
+
+def decrease_sum(First, Last, M, Selection):
+	""" Computes the sum of decrease(x, M, Selection) for ranks x in [First, Last[
+		without enumerating ranks (long stretches use the integral of 1/x)
+	"""
+	if M == 0 or Last <= First:	return 0
+	if not Selection:	return (Last - First) / float(M)
+	Offset = (1.0*M)/Selection
+	def harmonic(a, b):
+		" sum of 1/(x+Offset) for x in [a, b[ "
+		if b - a <= 1000:	return sum([1.0/(x+Offset) for x in range(a, b)])
+		return log((b + Offset - 0.5) / (a + Offset - 0.5))	# midpoint approximation
+	return (harmonic(First, Last) + harmonic(First+1, Last+1)) / 2 / log(1+Selection)
+
 # def powerlaw(x, DropCoefficient):
 	# " Computes a decreasing power law "
 	# return (1+x) ** -DropCoefficient
@@ -62,6 +91,120 @@ def chances(proba, N):
 		return int(C) + 1
 	return int(C)
 
+def chances_all(Probas, N):
+	" computes 'chances' for a whole list of probabilities "
+	Draws = [random.random() for p in Probas]	# drawn in the same order as successive calls to 'chances'
+	return [int(N * p) + (D < (N * p) % 1) for (p, D) in zip(Probas, Draws)]
+
+def random_other(Items, Excluded=()):
+	" picks an item at random in Items, except those in Excluded - returns None if none is left "
+	if len(Items) > len(Excluded):
+		# rejection sampling: a couple of draws usually suffice
+		for Trial in range(10):
+			Item = random.choice(Items)
+			if Item not in Excluded:	return Item
+	Others = [Item for Item in Items if Item not in Excluded]
+	if Others:	return random.choice(Others)
+	return None
+
+def random_pairing(Items):
+	" associates each item with another item drawn at random (None if there is no other item) "
+	N = len(Items)
+	if N < 2:	return [(Item, None) for Item in Items]
+	# adding a non-zero offset (modulo N) to the position of an item designates another item
+	return [(Item, Items[(Nbr + random.randrange(1, N)) % N]) for (Nbr, Item) in enumerate(Items)]
+
+def bernoulli_positions(proba, N):
+	""" yields the positions, among N independent trials, of the trials that succeed with probability proba.
+		Positions are reached by geometric skips, so the cost depends on the number of successes, not on N
+	"""
+	if proba <= 0:	return
+	if proba >= 1:
+		yield from range(N)
+		return
+	LogFailure = log(1.0 - proba)
+	pos = -1
+	while True:
+		# number of failures before next success follows a geometric law
+		pos += 1 + int(log(1.0 - random.random()) / LogFailure)
+		if pos >= N:	return
+		yield pos
+
+def binomial(N, proba):
+	""" number of successes among N independent trials with probability proba.
+		Exact when few successes (or few failures) are expected, normal approximation otherwise
+	"""
+	if N <= 0 or proba <= 0:	return 0
+	if proba >= 1:	return N
+	q = min(proba, 1 - proba)	# rare outcome
+	if N * q < 30:	Rare = sum(1 for pos in bernoulli_positions(q, N))
+	else:	Rare = min(N, max(0, int(round(random.gauss(N * q, sqrt(N * q * (1 - q)))))))
+	return Rare if q == proba else N - Rare
+
+def multinomial(N, Probas):
+	" splits N trials among outcomes with probabilities Probas (summing to 1) - returns the counts "
+	if N < 4 * len(Probas):
+		# few trials: each trial is drawn separately
+		Cumulative = list(accumulate(Probas))
+		Counts = [0] * len(Probas)
+		for Trial in range(N):
+			Counts[min(bisect_right(Cumulative, random.random() * Cumulative[-1]), len(Probas) - 1)] += 1
+		return Counts
+	Counts = []
+	Rest = float(sum(Probas))
+	for p in Probas[:-1]:
+		# each outcome is drawn conditionally on the previous ones
+		C = binomial(N, p / Rest) if Rest > 0 else 0
+		Counts.append(C)
+		N -= C
+		Rest -= p
+	return Counts + [N]
+
+def hypergeometric(Good, Total, Draws):
+	""" number of good items among Draws items drawn without replacement from Total items, Good of which are good.
+		Exact for small draws, normal approximation otherwise
+	"""
+	if Draws <= 0 or Good <= 0:	return 0
+	if Draws >= Total:	return Good
+	if Good >= Total:	return Draws
+	if Draws > Total // 2:	return Good - hypergeometric(Good, Total, Total - Draws)	# undrawn items
+	if Draws <= 1000:
+		Found = 0
+		for Trial in range(Draws):
+			if random.random() * (Total - Trial) < Good - Found:	Found += 1
+		return Found
+	p = float(Good) / Total
+	Sigma = sqrt(Draws * p * (1 - p) * (Total - Draws) / (Total - 1.0))
+	Found = int(round(random.gauss(Draws * p, Sigma)))
+	return min(Good, Draws, max(0, Draws - (Total - Good), Found))
+
+def sample_counts(Counts, Draws):
+	""" draws Draws items without replacement from groups of items of sizes Counts.
+		Returns the number of items drawn in each group
+	"""
+	Total = sum(Counts)
+	Draws = min(Draws, Total)
+	if Draws <= 10 * len(Counts) + 1000:
+		# items are drawn by number
+		Cumulative = list(accumulate(Counts))
+		Drawn = [0] * len(Counts)
+		for Nbr in random.sample(range(Total), Draws):	Drawn[bisect_right(Cumulative, Nbr)] += 1
+		return Drawn
+	Drawn = []
+	for C in Counts:
+		# each group is drawn conditionally on the previous ones
+		D = hypergeometric(C, Total, Draws)
+		Drawn.append(D)
+		Total -= C
+		Draws -= D
+	return Drawn
+
+try:	popcount = int.bit_count	# number of 1s in an integer (Python >= 3.10)
+except AttributeError:
+	def popcount(x):
+		" number of 1s in the binary representation of x "
+		return bin(x).count('1')
+
 def uniform(proba, Max=1):
 	" computes random uniform variable between 0 and Max "
 	if isinstance(Max, int) and Max > 1:
@@ -223,6 +366,118 @@ class LimitedMemory:
 		# return ' '.join(["%0.1f" % b[1] for b in self.past])
 		return str(self.past)
 
+class LRUCache:
+	"   memory of key-value pairs with limited size - least recently used pairs are forgotten first  "
+
+	def __init__(self, MaxSize):
+		self.MaxSize = MaxSize
+		self.reset()
+
+	def __len__(self):	return len(self.memory)
+
+	def reset(self):
+		self.memory = OrderedDict()
+		self.hits = 0
+		self.misses = 0
+
+	def get(self, Key, default=None):
+		" retrieves the value stored under Key (recording hits and misses) "
+		try:	Value = self.memory[Key]
+		except KeyError:
+			self.misses += 1
+			return default
+		self.memory.move_to_end(Key)
+		self.hits += 1
+		return Value
+
+	def store(self, Key, Value):
+		self.memory[Key] = Value
+		self.memory.move_to_end(Key)
+		if len(self.memory) > self.MaxSize:	self.memory.popitem(last=False)
+
+	def hit_rate(self):
+		" proportion of successful retrievals "
+		if self.hits + self.misses == 0:	return 0
+		return self.hits / float(self.hits + self.misses)
+
+	def __str__(self):
+		return 'size: %d/%d\thits: %d\tmisses: %d' % (len(self.memory), self.MaxSize, self.hits, self.misses)
+
+class Fenwick:
+	"""   cumulative sums of a list of numbers (Fenwick tree).
+		Values can be changed, partial sums computed and searched in logarithmic time
+	"""
+
+	def __init__(self, Values=()):
+		self.tree = [0] + list(Values)	# tree[i] holds the sum of a stretch of values ending at i-1
+		self.size = len(self.tree) - 1
+		for i in range(1, self.size + 1):
+			Parent = i + (i & -i)
+			if Parent <= self.size:	self.tree[Parent] += self.tree[i]
+
+	def __len__(self):	return self.size
+
+	def add(self, Index, Delta):
+		" adds Delta to the value at Index "
+		i = Index + 1
+		while i <= self.size:
+			self.tree[i] += Delta
+			i += i & -i
+
+	def prefix(self, Index):
+		" sum of the Index first values "
+		Sum = 0
+		while Index > 0:
+			Sum += self.tree[Index]
+			Index -= Index & -Index
+		return Sum
+
+	def total(self):	return self.prefix(self.size)
+
+	def find(self, x):
+		" returns the first index at which the cumulative sum exceeds x "
+		Index = 0
+		Step = 1 << self.size.bit_length()
+		while Step:
+			if Index + Step <= self.size and self.tree[Index + Step] <= x:
+				Index += Step
+				x -= self.tree[Index]
+			Step >>= 1
+		return Index
+
+class Candidates(Sequence):
+	"""   list of [item, count] pairs restricted to pairs with a positive count.
+		Counts are consumed through 'consume': exhausted pairs leave the list.
+		Accessing the kth pair takes logarithmic time, and so do
+		random.choice and random.sample on the list
+	"""
+
+	def __init__(self, Pairs):
+		self.pairs = Pairs	# all pairs, including exhausted ones
+		self.positions = {id(P): i for (i, P) in enumerate(Pairs)}
+		self.present = [1 if P[1] > 0 else 0 for P in Pairs]
+		self.index_ = Fenwick(self.present)	# counts present pairs
+		self.size = sum(self.present)
+
+	def __len__(self):	return self.size
+
+	def __getitem__(self, Rank):
+		if isinstance(Rank, slice):	return [self[R] for R in range(*Rank.indices(self.size))]
+		if Rank < 0:	Rank += self.size
+		if not 0 <= Rank < self.size:	raise IndexError('Candidates: index out of range')
+		return self.pairs[self.index_.find(Rank)]
+
+	def __iter__(self):	return (P for (P, Present) in zip(self.pairs, self.present) if Present)
+
+	def consume(self, Pair, Nb=1):
+		" decreases the count of Pair, which leaves the list when exhausted "
+		Pair[1] -= Nb
+		Position = self.positions.get(id(Pair))
+		if Position is not None and Pair[1] <= 0 and self.present[Position]:
+			self.present[Position] = 0
+			self.index_.add(Position, -1)
+			self.size -= 1
+
 #########
 # Boost #
 #########